@@ -0,0 +1,222 @@
+"""
+Micro-benchmarks for the app's in-process CPU hot paths.
+
+Runs without network access or a Streamlit runtime. Reports the best time
+per call over --repeat runs and the peak traced memory of each benchmark,
+and compares them to a stored baseline:
+
+    python -m benchmarks.bench_hot_paths --save-baseline
+    python -m benchmarks.bench_hot_paths              # fails on regressions
+                                                      # or a missing baseline
+    python -m benchmarks.bench_hot_paths --filter ssml
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks import fixtures
+
+st = fixtures.install_streamlit_stand_in()
+
+import main  # noqa: E402  (needs the Streamlit stand-in first)
+from services.speech_service import SpeechService  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "baseline.json")
+# Below this, timing differences are scheduler noise rather than regressions.
+NOISE_FLOOR_S = 5e-6
+
+main.get_conversation_store = fixtures.NullStore
+main.get_audio_spool = fixtures.NullSpool
+
+
+def _speech_service():
+    service = SpeechService.__new__(SpeechService)
+    service.TONE_PROFILES = main.constants.CONVERSATION_TONE_CONFIG
+    return service
+
+
+def _app():
+    app = main.VoiceAgentApp.__new__(main.VoiceAgentApp)
+    app.AZURE_SYSTEM_PROMPT_BASE = main.constants.AZURE_SYSTEM_PROMPT_BASE
+    app.OPENAI_SYSTEM_PROMPT_BASE = main.constants.OPENAI_SYSTEM_PROMPT_BASE
+    app.tone_profiles = main.constants.CONVERSATION_TONE_CONFIG
+    return app
+
+
+class Benchmark:
+    """`func` is timed; `setup` is not. With `setup_each_call` the setup
+    runs before every call (for functions that mutate their state),
+    otherwise once before measuring."""
+
+    def __init__(self, func, setup=None, setup_each_call=False):
+        self.func = func
+        self.setup = setup
+        self.setup_each_call = setup_each_call
+
+
+def _with_state(func, reply=fixtures.SHORT_REPLY, turns=0,
+                tts_service="Azure", setup_each_call=False):
+    history = fixtures.history_fixture(turns)
+    state = fixtures.session_state_fixture(reply=reply,
+                                           tts_service=tts_service)
+
+    def setup():
+        st.session_state.clear()
+        st.session_state.update(state)
+        st.session_state.conversation_history = list(history)
+    return Benchmark(func, setup, setup_each_call)
+
+
+def build_benchmarks():
+    speech = _speech_service()
+    app = _app()
+    benchmarks = {}
+
+    for label, reply in fixtures.REPLIES.items():
+        benchmarks[f"clean_text[{label}]"] = (
+            lambda reply=reply: speech.clean_text(reply))
+        benchmarks[f"build_ssml[{label}]"] = (
+            lambda reply=reply: speech.build_ssml(
+                reply, {"volume": "medium"}, tone="friendly", lang="en-US"))
+
+    for turns in fixtures.HISTORY_SIZES:
+        for tts_service in ("Azure", "OpenAI"):
+            benchmarks[f"gen_system_prompt[{tts_service},{turns}]"] = \
+                _with_state(app._gen_system_prompt, turns=turns,
+                            tts_service=tts_service)
+        benchmarks[f"append_conversation_history[{turns}]"] = _with_state(
+            lambda: app.append_conversation_history(datetime(2025, 1, 1)),
+            reply=fixtures.LONG_REPLY, turns=turns, setup_each_call=True)
+        benchmarks[f"render_history[{turns}]"] = _with_state(
+            app.render_history, turns=turns)
+
+    try:
+        from services.text_eval import evaluate_text
+    except ImportError:
+        print("⚠️ jiwer not installed, skipping evaluate_text benchmarks.")
+    else:
+        for label, reply in fixtures.REPLIES.items():
+            hypothesis = reply.replace("the", "a").replace("ist", "war")
+            benchmarks[f"evaluate_text[{label}]"] = (
+                lambda reply=reply, hyp=hypothesis: evaluate_text(reply, hyp))
+
+    return benchmarks
+
+
+def _time_loops(bench, loops):
+    if not bench.setup_each_call:
+        start = time.perf_counter()
+        for _ in range(loops):
+            bench.func()
+        return time.perf_counter() - start
+    elapsed = 0.0
+    for _ in range(loops):
+        bench.setup()
+        start = time.perf_counter()
+        bench.func()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def measure(bench, repeat=5, min_time=0.05):
+    """Best seconds per call over `repeat` runs (the least noisy estimate,
+    as timeit recommends) and peak traced bytes of one call. Setup is kept
+    out of both."""
+    if not isinstance(bench, Benchmark):
+        bench = Benchmark(bench)
+    if bench.setup:
+        bench.setup()
+    loops = 1
+    while True:
+        elapsed = _time_loops(bench, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        timings.append(_time_loops(bench, loops) / loops)
+
+    if bench.setup:
+        bench.setup()
+    tracemalloc.start()
+    bench.func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time_s": min(timings), "peak_bytes": peak}
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ("time_s", "peak_bytes"):
+            limit = base[metric] * (1 + tolerance)
+            if metric == "time_s":
+                limit = max(limit, base[metric] + NOISE_FLOOR_S)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name} {metric}: {base[metric]:.6g} -> "
+                    f"{result[metric]:.6g}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks")
+    parser.add_argument("--filter", help="Only run benchmarks matching this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown before failing (0.5 = 50%%)")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    benchmarks = build_benchmarks()
+    results = {}
+    print(f"{'benchmark':<45} {'time/call':>12} {'peak mem':>12} "
+          f"{'vs baseline':>12}")
+    for name, func in benchmarks.items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(func, repeat=args.repeat)
+        change = ""
+        if name in baseline and baseline[name]["time_s"]:
+            change = (f"{(results[name]['time_s'] / baseline[name]['time_s'] - 1) * 100:+.1f}%")
+        print(f"{name:<45} {results[name]['time_s'] * 1e6:>10.1f}µs "
+              f"{results[name]['peak_bytes'] / 1024:>9.1f}KiB {change:>12}")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return
+
+    missing = [name for name in results if name not in baseline]
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("-" * 100)
+        sys.exit("❌ Regressions:\n" + "\n".join(regressions))
+    if missing:
+        print("-" * 100)
+        sys.exit(f"❌ No baseline for {len(missing)} benchmarks in "
+                 f"{args.baseline}:\n" + "\n".join(missing) +
+                 "\nRun with --save-baseline on this machine first.")
+    print(f"✅ No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main_cli()
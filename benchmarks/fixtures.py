@@ -0,0 +1,118 @@
+"""
+Offline fixtures for the hot-path benchmarks.
+
+`install_streamlit_stand_in` registers a minimal `streamlit` module so
+`main.py` can be imported and its methods called without a Streamlit
+runtime; UI calls become no-ops and session state is a plain dict.
+"""
+import sys
+import types
+from datetime import datetime, timedelta
+
+SHORT_REPLY = "Sure! Here's the weather for today: sunny, 24 degrees."
+
+LONG_REPLY = (
+    "Great question! Cricket began in England... and it is now played all "
+    "over the world -- from India to Australia. <emphasis level='strong'>"
+    "Millions</emphasis> of fans follow every match!\n\nWould you like to "
+    "hear about the rules? <break time='300ms'/> Or maybe the history of "
+    "the Ashes? It's a rivalry that started in 1882: a mock obituary said "
+    "English cricket had died!\n"
+) * 6
+
+MULTILINGUAL_REPLY = (
+    "Natürlich! Das Wetter in München ist heute sonnig -- etwa 24 Grad... "
+    "Möchten Sie mehr wissen? 天気は晴れです! ¿Quieres saber más? "
+    "Ça va très bien, merci! 😊\n"
+) * 4
+
+REPLIES = {
+    "short": SHORT_REPLY,
+    "long": LONG_REPLY,
+    "multilingual": MULTILINGUAL_REPLY,
+}
+
+HISTORY_SIZES = (1, 10, 100)
+
+
+class SessionState(dict):
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def to_dict(self):
+        return dict(self)
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def install_streamlit_stand_in():
+    st = types.ModuleType("streamlit")
+    st.session_state = SessionState()
+    st.query_params = {}
+    st.cache_resource = lambda func: func
+    for name in ("markdown", "audio", "write", "toast", "error", "caption",
+                 "title", "set_page_config"):
+        setattr(st, name, lambda *args, **kwargs: None)
+    st.expander = lambda *args, **kwargs: _NullContext()
+    st.spinner = lambda *args, **kwargs: _NullContext()
+    st.sidebar = types.SimpleNamespace(
+        title=st.title, markdown=st.markdown, expander=st.expander)
+    sys.modules["streamlit"] = st
+    return st
+
+
+class NullStore:
+    def append_turn(self, conversation_id, turn):
+        pass
+
+
+class NullSpool:
+    def touch(self, path):
+        pass
+
+
+def session_state_fixture(reply=SHORT_REPLY, tts_service="Azure"):
+    return {
+        "session_id": "bench",
+        "audio_unchanged": False,
+        "language": "en-US",
+        "selected_tone": "friendly",
+        "selected_voice_tone": "friendly",
+        "recorded_audio": None,
+        "transcript": "Tell me something interesting about cricket, please.",
+        "ssml_config": {"rate": "medium", "pitch": "medium",
+                        "volume": "medium", "style": "cheerful"},
+        "response": reply,
+        "transcription_time": 1.12,
+        "prompt_result_time": 2.35,
+        "prompt_tokens": 812,
+        "speech_time": 3.4,
+        "conversation_history": [],
+        "tts_service": tts_service,
+        "output_path": None,
+        "output_format": "wav",
+        "speech_output_format": "wav",
+    }
+
+
+def history_fixture(turns, reply=LONG_REPLY):
+    start = datetime(2025, 1, 1, 12, 0)
+    history = []
+    for i in range(turns):
+        entry = session_state_fixture(reply=reply)
+        entry.pop("conversation_history")
+        entry["timestamp"] = start + timedelta(minutes=i)
+        history.insert(0, entry)
+    return history
@@ -0,0 +1,135 @@
+"""
+Cold-start benchmark for the Streamlit entry point.
+
+Every measurement runs in a fresh interpreter so module caches never hide
+import cost. Run from the repo root:
+
+    python -m benchmarks.startup_bench --save static/startup_baseline.json
+    python -m benchmarks.startup_bench --baseline static/startup_baseline.json
+
+`--first-request` also times the first round-trip to each backend
+(needs the usual service credentials in the environment), once cold and
+once after `warm_up()`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from services.warmup import HEAVY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import time
+from services.openai_service import OpenAIService
+from services.speech_service import SpeechService
+
+service = {service}()
+if {warm}:
+    service.warm_up()
+start = time.perf_counter()
+{call}
+print(time.perf_counter() - start)
+"""
+
+FIRST_REQUESTS = {
+    "OpenAIService": "service.ask([{'role': 'user', 'content': 'Hi'}], "
+                     "max_tokens=1)",
+    "SpeechService": "service.text_to_speech('Hi', {})",
+}
+
+
+def _run(snippet):
+    proc = subprocess.run([sys.executable, "-c", snippet], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def _median(snippet, repeat):
+    return round(statistics.median(_run(snippet) for _ in range(repeat)), 4)
+
+
+def bench_imports(repeat):
+    results = {}
+    for module in ("main",) + HEAVY_MODULES:
+        try:
+            results[f"import:{module}"] = _median(
+                IMPORT_SNIPPET.format(module=module), repeat)
+        except RuntimeError as e:
+            print(f"⚠️ Skipping import of {module}: {e}")
+    return results
+
+
+def bench_first_requests(repeat):
+    results = {}
+    for service, call in FIRST_REQUESTS.items():
+        for warm in (False, True):
+            key = f"first_request:{service}:{'warm' if warm else 'cold'}"
+            try:
+                results[key] = _median(FIRST_REQUEST_SNIPPET.format(
+                    service=service, warm=warm, call=call), repeat)
+            except RuntimeError as e:
+                print(f"⚠️ Skipping {key}: {e}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, value in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        change = (value - base) / base * 100 if base else 0.0
+        flag = ""
+        if value > base * (1 + tolerance):
+            flag = "  ⚠️ REGRESSION"
+            regressions.append(key)
+        print(f"{key:<50} {base:>9.4f}s -> {value:>9.4f}s "
+              f"({change:+.1f}%){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--first-request", action="store_true")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = bench_imports(args.repeat)
+    if args.first_request:
+        results.update(bench_first_requests(args.repeat))
+
+    for key, value in results.items():
+        print(f"{key:<50} {value:>9.4f}s")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Saved results to {args.save}")
+
+    if args.baseline:
+        print("-" * 100)
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(f"❌ Startup regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,2 @@
-from .convo_tone_conf import *
\ No newline at end of file
+from .convo_tone_conf import *
+from .tts_output_formats import *
@@ -0,0 +1,54 @@
+# Output formats shared by both TTS providers.
+# "openai" is the `response_format` of audio.speech.create, "azure" the
+# SpeechSynthesisOutputFormat member. "decoder" says how the app turns the
+# file into samples: "wav"/"pcm" are parsed in-process, "ffmpeg" spawns it.
+TTS_OUTPUT_FORMATS = {
+    "wav": {
+        "openai": "wav",
+        "azure": "Riff24Khz16BitMonoPcm",
+        "suffix": ".wav",
+        "mime": "audio/wav",
+        "decoder": "wav",
+    },
+    "pcm": {
+        "openai": "pcm",
+        "azure": "Raw24Khz16BitMonoPcm",
+        "suffix": ".pcm",
+        "mime": "audio/wav",
+        "decoder": "pcm",
+        "sample_rate": 24000,
+        "sample_width": 2,
+        "channels": 1,
+    },
+    "opus": {
+        "openai": "opus",
+        "azure": "Ogg24Khz16BitMonoOpus",
+        "suffix": ".ogg",
+        "mime": "audio/ogg",
+        "decoder": "ffmpeg",
+    },
+    "mp3_48k": {
+        "openai": "mp3",
+        "azure": "Audio24Khz48KBitRateMonoMp3",
+        "suffix": ".mp3",
+        "mime": "audio/mpeg",
+        "decoder": "ffmpeg",
+    },
+    "mp3_96k": {
+        "openai": "mp3",
+        "azure": "Audio24Khz96KBitRateMonoMp3",
+        "suffix": ".mp3",
+        "mime": "audio/mpeg",
+        "decoder": "ffmpeg",
+    },
+    "mp3_160k": {
+        "openai": "mp3",
+        "azure": "Audio24Khz160KBitRateMonoMp3",
+        "suffix": ".mp3",
+        "mime": "audio/mpeg",
+        "decoder": "ffmpeg",
+    },
+}
+
+# WAV plays in the browser and is parsed by pydub without ffmpeg.
+DEFAULT_TTS_OUTPUT_FORMAT = "wav"
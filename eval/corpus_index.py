@@ -0,0 +1,115 @@
+import os
+import wave
+
+import pandas as pd
+
+MANIFEST_NAME = ".corpus_manifest.parquet"
+AUDIO_EXTENSIONS = (".wav",)
+# Upper edges in seconds; anything longer falls in the last bucket.
+DURATION_BUCKETS = (2.0, 5.0, 10.0, 20.0)
+
+
+def _audio_info(path):
+    try:
+        with wave.open(path, "rb") as f:
+            return f.getnframes() / f.getframerate(), f.getframerate()
+    except (wave.Error, EOFError):
+        # Non-PCM WAVs (float, extensible headers) need libsndfile.
+        import soundfile as sf
+        info = sf.info(path)
+        return info.duration, info.samplerate
+
+
+def duration_bucket(duration, edges=DURATION_BUCKETS):
+    lower = 0.0
+    for upper in edges:
+        if duration < upper:
+            return f"{lower:g}-{upper:g}s"
+        lower = upper
+    return f"{lower:g}s+"
+
+
+def build_manifest(root, manifest_path=None, refresh=False):
+    """
+    Scan `root` once and cache path, sub-folder, size, mtime, duration and
+    sample rate of every audio file in a Parquet manifest.
+
+    Files whose size and mtime are unchanged since the last scan reuse the
+    cached row, so re-indexing a large corpus only reads new headers.
+    """
+    manifest_path = manifest_path or os.path.join(root, MANIFEST_NAME)
+    cached = {}
+    if not refresh and os.path.exists(manifest_path):
+        cached = {row["path"]: row for row in
+                  pd.read_parquet(manifest_path).to_dict("records")}
+
+    rows = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if not name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, name)
+            stat = os.stat(path)
+            row = cached.get(path)
+            if (row is None or row["size"] != stat.st_size
+                    or row["mtime"] != stat.st_mtime):
+                try:
+                    duration, sample_rate = _audio_info(path)
+                except Exception as e:
+                    print(f"⚠️ Skipping unreadable audio {path}: {e}")
+                    continue
+                row = {
+                    "path": path,
+                    "sub_folder": os.path.relpath(dirpath, root),
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                    "duration": round(duration, 3),
+                    "sample_rate": sample_rate,
+                }
+            rows.append(row)
+
+    manifest = pd.DataFrame(rows, columns=["path", "sub_folder", "size",
+                                           "mtime", "duration",
+                                           "sample_rate"])
+    manifest["duration_bucket"] = manifest["duration"].map(duration_bucket)
+    manifest = manifest.sort_values("path").reset_index(drop=True)
+    manifest.to_parquet(manifest_path, index=False)
+    print(f"📇 Indexed {len(manifest)} audio files under {root}")
+    return manifest
+
+
+def _allocate(sizes, total):
+    """Split `total` across strata proportionally (largest remainder),
+    never asking a stratum for more items than it has."""
+    population = sum(sizes.values())
+    total = min(total, population)
+    quotas = {key: total * size / population for key, size in sizes.items()}
+    alloc = {key: int(quota) for key, quota in quotas.items()}
+    by_remainder = sorted(quotas, key=lambda k: quotas[k] - alloc[k],
+                          reverse=True)
+    while sum(alloc.values()) < total:
+        for key in by_remainder:
+            if sum(alloc.values()) == total:
+                break
+            if alloc[key] < sizes[key]:
+                alloc[key] += 1
+    return alloc
+
+
+def sample_manifest(manifest, count, seed=42,
+                    strata=("sub_folder", "duration_bucket")):
+    """
+    Draw `count` files without replacement, stratified by `strata`.
+
+    Results only depend on the manifest contents and `seed`, so the same
+    corpus and seed always produce the same sample.
+    """
+    if manifest.empty or count <= 0:
+        return manifest.iloc[0:0]
+    strata = list(strata)
+    groups = dict(tuple(manifest.groupby(strata, sort=True)))
+    alloc = _allocate({key: len(group) for key, group in groups.items()},
+                      count)
+    parts = [groups[key].sample(n=n, random_state=seed)
+             for key, n in alloc.items() if n > 0]
+    return pd.concat(parts).sort_values("path").reset_index(drop=True)
@@ -1,72 +1,101 @@
-import datetime
 import os
-import random
+import time
 
 import pandas as pd
 
+from eval.corpus_index import build_manifest, sample_manifest
+from eval.results_store import ResultsStore
 from services.speech_service import SpeechService
-from services.text_eval import evaluate_text
+from services.text_eval import word_error_rate
 
 
-def eval_speech_service(path):
+def _service_config(service):
+    return {
+        "service": "azure_speech",
+        "method": service.method,
+        "languages": ",".join(service.languages),
+    }
+
+
+def eval_speech_service(path, seed=42, max_sample=None):
     service = SpeechService()
-    final_resp = []
-    for sub_folder in os.listdir(path):
-        item_path = os.path.join(path, sub_folder)
-        if os.path.isdir(item_path):
-            print("-" * 100)
-            print(f"Visiting : {sub_folder}...")
-            print("-" * 50)
+    with ResultsStore(service_config=_service_config(service)) as store:
+        print(f"Run id: {store.run_id}")
+        _eval_manifest(service, store, build_manifest(path), seed, max_sample)
 
-            idx = 0
-            max_sample = int(input("How many samples to process? : "))
-            while idx < max_sample:
-                file = random.choice(os.listdir(item_path))
-                if not file.endswith(".wav"):
-                    continue
-                print(f"{idx + 1}. {file}")
-                idx += 1
-                res = service.speech_to_text(audio_path=file)
-                final_resp.append(res)
 
-    df = pd.json_normalize(final_resp)
-    df.to_csv(f"static/output_{datetime.datetime.now()}.csv", index=False)
+def _eval_manifest(service, store, manifest, seed, max_sample):
+    for sub_folder, files in manifest.groupby("sub_folder", sort=True):
+        print("-" * 100)
+        print(f"Visiting : {sub_folder}...")
+        print("-" * 50)
+
+        folder_samples = max_sample
+        if folder_samples is None:
+            folder_samples = int(input("How many samples to process? : "))
+        sample = sample_manifest(files, folder_samples, seed=seed,
+                                 strata=("duration_bucket",))
+        for idx, row in enumerate(sample.itertuples()):
+            print(f"{idx + 1}. {row.path}")
+            start = time.time()
+            res = service.speech_to_text(audio_path=row.path)
+            res.update({
+                "time_taken": res.get("processing_time", 0.0),
+                "sub_folder": sub_folder,
+                "duration": row.duration,
+                "duration_bucket": row.duration_bucket,
+            })
+            store.append(res, language=res.get("language"), timings={
+                "stt": res.get("processing_time", 0.0),
+                "total": round(time.time() - start, 3),
+            })
 
 
 def eval_audio_transcriptions(path, csv_name):
     service = SpeechService(play_audio=False)
     df = pd.read_csv(os.path.join(path, csv_name))
 
-    resp = []
     max_sample = input("How many samples to process? Leave blank for all : ")
     if max_sample in (None, ""):
         max_sample = len(df)
 
-    for idx in range(int(max_sample)):
-        print("Processing file index:", idx+1)
-        file_row = df.iloc[idx].to_dict()
-        res = service.speech_to_text(audio_path=file_row["audio_path"])
-        gen_transcript = res.get("text", "")
-        og_transcript = file_row["transcript"]
-        file_row.update({
-            "transcript": og_transcript,
-            "gen_transcript": gen_transcript,
-            "word_error_rate": evaluate_text(og_transcript, gen_transcript),
-            "time_taken": res.get("processing_time", 0.0),
-        })
-        resp.append(file_row)
-        print(f"""
-        File Name: {file_row["audio_path"]},
-        File Transcript: {og_transcript},
-        Generated Transcript: {gen_transcript},
-        File WER: {file_row["word_error_rate"]}
-        Time Taken: {res.get("processing_time", 0.0)} seconds,
-        """)
-        print("-" * 50)
+    # The context manager flushes buffered rows even if the run is aborted.
+    with ResultsStore(service_config=_service_config(service)) as store:
+        print(f"Run id: {store.run_id}")
+        for idx in range(int(max_sample)):
+            print("Processing file index:", idx+1)
+            start = time.time()
+            file_row = df.iloc[idx].to_dict()
+            res = service.speech_to_text(audio_path=file_row["audio_path"])
+            gen_transcript = res.get("text") or ""
+            og_transcript = file_row["transcript"]
+            wer_start = time.time()
+            wer, wer_error = word_error_rate(og_transcript, gen_transcript)
+            file_row.update({
+                "transcript": og_transcript,
+                "gen_transcript": gen_transcript,
+                "detected_language": res.get("language"),
+                "status": res.get("status"),
+                "word_error_rate": wer,
+                "wer_error": wer_error,
+                "time_taken": res.get("processing_time", 0.0),
+            })
+            store.append(file_row, language=file_row.get("language_code"),
+                         timings={
+                             "stt": res.get("processing_time", 0.0),
+                             "wer": round(time.time() - wer_start, 3),
+                             "total": round(time.time() - start, 3),
+                         })
+            print(f"""
+            File Name: {file_row["audio_path"]},
+            File Transcript: {og_transcript},
+            Generated Transcript: {gen_transcript},
+            File WER: {wer if wer is not None else wer_error}
+            Time Taken: {res.get("processing_time", 0.0)} seconds,
+            """)
+            print("-" * 50)
 
-    resp_df = pd.json_normalize(resp)
-    resp_df.to_csv(f"static/output_{datetime.datetime.now()}.csv",
-                   index=False)
+    print(f"Results appended to {store.path} (run id: {store.run_id})")
 
 if __name__ == "__main__":
     # eval_speech_service(path="audio_files")
@@ -0,0 +1,96 @@
+"""
+Offline stand-ins for SpeechService and OpenAIService.
+
+They implement the methods the eval tooling calls with the same signatures
+and return shapes, but never touch the network. "Synthesized" audio is a
+16 kHz mono WAV whose samples carry the UTF-8 text, and "recognition" reads
+it back, so round-trips are exact and CI runs are deterministic.
+"""
+import struct
+import tempfile
+import time
+import wave
+
+import constants
+
+MAGIC = b"LOCALTTS"
+SAMPLE_RATE = 16000
+
+
+def write_text_wav(path, text, lang):
+    payload = f"{lang}\n{text}".encode("utf-8")
+    frames = MAGIC + struct.pack("<I", len(payload)) + payload
+    if len(frames) % 2:
+        frames += b"\x00"
+    # Pad to roughly speaking length so durations look plausible.
+    frames += b"\x00\x00" * int(SAMPLE_RATE * 0.3 * len(text.split()))
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(frames)
+
+
+def read_text_wav(path):
+    with wave.open(path, "rb") as f:
+        frames = f.readframes(f.getnframes())
+    if not frames.startswith(MAGIC):
+        return None, None
+    (size,) = struct.unpack("<I", frames[len(MAGIC):len(MAGIC) + 4])
+    start = len(MAGIC) + 4
+    lang, text = frames[start:start + size].decode("utf-8").split("\n", 1)
+    return lang, text
+
+
+def _output_path():
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
+        return f.name
+
+
+class LocalSpeechService:
+    def __init__(self, latency=0.0, method="RECOGNIZE_ONCE"):
+        self.latency = latency
+        self.method = method
+        self.languages = ["en-US", "de-DE"]
+        self.TONE_PROFILES = constants.CONVERSATION_TONE_CONFIG
+
+    def text_to_speech(self, text, ssml_config, tone="friendly", lang="en-US",
+                       output_format="wav"):
+        start = time.time()
+        time.sleep(self.latency)
+        output_path = _output_path()
+        write_text_wav(output_path, text, lang)
+        return output_path, round(time.time() - start, 2)
+
+    def speech_to_text(self, audio_path):
+        start = time.time()
+        time.sleep(self.latency)
+        lang, text = read_text_wav(audio_path)
+        return {
+            "name": audio_path,
+            "status": "Completed" if text else "NoSpeech",
+            "processing_time": round(time.time() - start, 2),
+            "method_used": self.method,
+            "text": text or "",
+            "language": lang or "en-US",
+        }
+
+
+class LocalOpenAIService:
+    def __init__(self, latency=0.0, lang="en-US", corpus=None):
+        self.latency = latency
+        self.lang = lang
+        # Real OpenAI TTS speaks whatever language the text is in; the
+        # stand-in looks the text up in the {language: [text, ...]} corpus.
+        self.text_languages = {text: language
+                               for language, texts in (corpus or {}).items()
+                               for text in texts}
+
+    def speak(self, text, voice="nova", instructions=None,
+              output_format="wav"):
+        start = time.time()
+        time.sleep(self.latency)
+        output_path = _output_path()
+        write_text_wav(output_path, text,
+                       self.text_languages.get(text, self.lang))
+        return output_path, round(time.time() - start)
@@ -0,0 +1,77 @@
+"""
+Replay a recorded WAV into the streaming recognition endpoint at real-time
+speed and print partial transcripts as they arrive.
+
+    python -m services.stream_server --port 8765
+    python -m eval.replay_stream data/en_us/001.wav --url ws://localhost:8765/ws/recognize
+
+The WAV must be 16-bit mono PCM at 8 or 16 kHz. Pass --token when the
+server runs with STREAM_SERVER_TOKEN.
+"""
+import argparse
+import asyncio
+import json
+import time
+import wave
+from urllib.parse import urlencode
+
+from tornado.websocket import websocket_connect
+
+
+async def _print_messages(conn, start):
+    while True:
+        message = await conn.read_message()
+        if message is None:
+            return None
+        payload = json.loads(message)
+        elapsed = time.time() - start
+        print(f"[{elapsed:6.2f}s] {payload['type']:<7} {payload.get('text')}")
+        if payload["type"] == "result":
+            return payload
+
+
+async def replay(path, url, chunk_ms=100, speed=1.0, token=None):
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2 or f.getnchannels() != 1:
+            raise ValueError("Expected a 16-bit mono PCM WAV file")
+        sample_rate = f.getframerate()
+        frames = f.readframes(f.getnframes())
+
+    query = {"rate": sample_rate}
+    if token:
+        query["token"] = token
+    conn = await websocket_connect(f"{url}?{urlencode(query)}")
+    start = time.time()
+    reader = asyncio.ensure_future(_print_messages(conn, start))
+
+    chunk_bytes = int(sample_rate * chunk_ms / 1000) * 2
+    for i, offset in enumerate(range(0, len(frames), chunk_bytes)):
+        await conn.write_message(frames[offset:offset + chunk_bytes],
+                                 binary=True)
+        # Pace against the wall clock so drift does not accumulate.
+        due = start + (i + 1) * chunk_ms / 1000 / speed
+        await asyncio.sleep(max(0.0, due - time.time()))
+
+    audio_done = time.time() - start
+    await conn.write_message("EOS")
+    result = await reader
+    print("-" * 50)
+    print(f"Audio length: {audio_done:.2f}s, final transcript "
+          f"{time.time() - start - audio_done:.2f}s after end of speech")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a WAV in real time")
+    parser.add_argument("path")
+    parser.add_argument("--url", default="ws://localhost:8765/ws/recognize")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--token", help="STREAM_SERVER_TOKEN of the server")
+    args = parser.parse_args()
+    asyncio.run(replay(args.path, args.url, args.chunk_ms, args.speed,
+                       args.token))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+
+import pandas as pd
+
+from eval.results_store import DEFAULT_RESULTS_PATH, load_results
+
+LATENCY_COL = "time_taken"
+WER_COL = "word_error_rate"
+
+
+def summarize(df, by=("run_id", "language")):
+    """p50/p95/p99 latency, throughput and mean WER per group."""
+    by = list(by)
+    grouped = df.groupby(by)
+    summary = grouped[LATENCY_COL].quantile([0.5, 0.95, 0.99]).unstack()
+    summary.columns = ["latency_p50", "latency_p95", "latency_p99"]
+    summary["samples"] = grouped.size()
+
+    recorded_at = pd.to_datetime(df["recorded_at"])
+    span = recorded_at.groupby([df[col] for col in by]).agg(
+        lambda s: (s.max() - s.min()).total_seconds())
+    # A single-row group has no span; fall back to its summed latency.
+    busy = grouped[LATENCY_COL].sum()
+    span = span.where(span > 0, busy)
+    summary["throughput_per_s"] = summary["samples"] / span
+
+    if WER_COL in df.columns:
+        summary["wer_mean"] = grouped[WER_COL].mean()
+        summary["wer_p95"] = grouped[WER_COL].quantile(0.95)
+    return summary.round(3).reset_index()
+
+
+def diff_runs(df, base_run, new_run):
+    """Per-language metric deltas of `new_run` against `base_run`."""
+    summary = summarize(df[df["run_id"].isin([base_run, new_run])])
+    base = summary[summary["run_id"] == base_run].set_index("language")
+    new = summary[summary["run_id"] == new_run].set_index("language")
+    metrics = [col for col in summary.columns
+               if col not in ("run_id", "language")]
+    delta = (new[metrics] - base[metrics]).add_suffix("_delta")
+    pct = ((new[metrics] - base[metrics]) / base[metrics] * 100).add_suffix(
+        "_pct")
+    return pd.concat([delta, pct], axis=1).round(2).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eval results report")
+    parser.add_argument("--path", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--runs", nargs="*",
+                        help="Only report these run ids")
+    parser.add_argument("--diff", nargs=2, metavar=("BASE_RUN", "NEW_RUN"),
+                        help="Compare two runs per language")
+    args = parser.parse_args()
+
+    run_ids = args.diff or args.runs
+    df = load_results(args.path, run_ids=run_ids)
+    if df.empty:
+        print("No results found.")
+        return
+
+    pd.set_option("display.width", 200)
+    print(summarize(df).to_string(index=False))
+    print("-" * 100)
+    print(summarize(df, by=("run_id",)).to_string(index=False))
+    if args.diff:
+        print("-" * 100)
+        print(f"Diff {args.diff[1]} vs {args.diff[0]}:")
+        print(diff_runs(df, *args.diff).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
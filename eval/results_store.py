@@ -0,0 +1,95 @@
+import datetime
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_RESULTS_PATH = "static/eval_results"
+PARTITION_COLS = ["run_id", "language"]
+
+
+def new_run_id():
+    return (f"{datetime.datetime.now().strftime('%Y%m%dT%H%M%S')}"
+            f"-{uuid.uuid4().hex[:6]}")
+
+
+class ResultsStore:
+    """
+    Append-only eval results, stored as a Parquet dataset partitioned by
+    run id and language.
+
+    Rows are buffered and flushed as a new fragment every `flush_every`
+    records; existing fragments are never rewritten. Use it as a context
+    manager so an interrupted run still flushes everything evaluated so far.
+    """
+
+    def __init__(self, run_id=None, service_config=None,
+                 path=DEFAULT_RESULTS_PATH, flush_every=50):
+        self.run_id = run_id or new_run_id()
+        self.service_config = service_config or {}
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer = []
+        self._fragment = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    def append(self, row, language="unknown", timings=None):
+        record = dict(row)
+        record.update({f"config_{key}": str(value)
+                       for key, value in self.service_config.items()})
+        record.update({f"timing_{key}": value
+                       for key, value in (timings or {}).items()})
+        record.update({
+            "run_id": self.run_id,
+            "language": language or "unknown",
+            "recorded_at": datetime.datetime.now().isoformat(),
+        })
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        table = pa.Table.from_pandas(pd.json_normalize(self._buffer),
+                                     preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            root_path=self.path,
+            partition_cols=PARTITION_COLS,
+            basename_template=f"part-{uuid.uuid4().hex[:8]}"
+                              f"-{self._fragment:05d}-{{i}}.parquet",
+        )
+        self._fragment += 1
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_results(path=DEFAULT_RESULTS_PATH, run_ids=None):
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    # Runs may record different columns (e.g. new timings), so read with the
+    # union of all fragment schemas rather than the first one found.
+    schema = pa.unify_schemas(
+        [dataset.schema] +
+        [fragment.physical_schema for fragment in dataset.get_fragments()],
+        promote_options="permissive"
+    )
+    dataset = ds.dataset(path, schema=schema, format="parquet",
+                         partitioning="hive")
+    row_filter = ds.field("run_id").isin(list(run_ids)) if run_ids else None
+    df = dataset.to_table(filter=row_filter).to_pandas()
+    for col in PARTITION_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    return df
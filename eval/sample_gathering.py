@@ -1,41 +1,174 @@
 import csv
+import io
 import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import soundfile as sf
-from datasets import load_dataset
-
+from datasets import Audio, load_dataset
 
 # Optional login if using private datasets
 # login("hf_your_token")
 
+MANIFEST_FIELDS = ["language_code", "audio_path", "transcript",
+                   "sample_rate", "duration"]
+
+
+def _load_samples(dataset_name: str, language_code: str, split: str,
+                  count: int, seed: int, streaming: bool, sampling: str,
+                  buffer_size: int):
+    if not streaming:
+        # Offline / cached path: the split is memory-mapped Arrow, so we only
+        # pick indices and never materialize the full split.
+        dataset = load_dataset(dataset_name, language_code, split=split)
+        dataset = dataset.cast_column("audio", Audio(decode=False))
+        indices = random.Random(seed).sample(range(len(dataset)),
+                                             min(count, len(dataset)))
+        return dataset.select(indices)
+
+    dataset = load_dataset(dataset_name, language_code, split=split,
+                           streaming=True)
+    # Keep raw bytes so decoding happens in the worker pool, not here.
+    dataset = dataset.cast_column("audio", Audio(decode=False))
+    if sampling == "reservoir":
+        # Selection happens while writing, see _write_reservoir.
+        return dataset
+    dataset = dataset.shuffle(seed=seed, buffer_size=buffer_size)
+    return dataset.take(count)
+
+
+def _write_sample(item, audio_path: str, language_code: str):
+    audio = item["audio"]
+    if audio.get("bytes"):
+        audio_array, sample_rate = sf.read(io.BytesIO(audio["bytes"]))
+    else:
+        audio_array, sample_rate = sf.read(audio["path"])
+    sf.write(audio_path, audio_array, sample_rate)
+
+    return {
+        "language_code": language_code,
+        "audio_path": audio_path,
+        "transcript": item.get("transcription", item.get("sentence", "")),
+        "sample_rate": sample_rate,
+        "duration": round(len(audio_array) / sample_rate, 3),
+    }
+
+
+def _discard_sample(future):
+    """Drop a sample that was pushed out of the reservoir."""
+    if future.cancel():
+        return
+
+    def remove(done):
+        if done.exception() is None:
+            os.remove(done.result()["audio_path"])
+    future.add_done_callback(remove)
+
+
+def _write_reservoir(items, count: int, seed: int, pool, output_dir: str,
+                     language_code: str, max_in_flight: int):
+    """
+    Reservoir-sample `count` items from a stream of unknown length.
+
+    Each item is written to disk as soon as it enters the reservoir and the
+    file of the item it replaces is deleted, so only in-flight writes are
+    held in memory and downloading overlaps with the write pool.
+    """
+    rng = random.Random(seed)
+    slots = [None] * count
+    in_flight = set()
+    for i, item in enumerate(items):
+        slot = i if i < count else rng.randint(0, i)
+        if slot >= count:
+            continue
+        audio_path = os.path.join(output_dir, f"reservoir-{i:08d}.wav")
+        future = pool.submit(_write_sample, item, audio_path, language_code)
+        if slots[slot] is not None:
+            _discard_sample(slots[slot])
+        slots[slot] = future
+        in_flight.add(future)
+        if len(in_flight) >= max_in_flight:
+            _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+    csv_rows = []
+    for slot, future in enumerate(slots):
+        if future is None:
+            continue
+        row = future.result()
+        audio_path = os.path.join(output_dir, f"{slot + 1:03d}.wav")
+        os.replace(row["audio_path"], audio_path)
+        csv_rows.append(dict(row, audio_path=audio_path))
+    return csv_rows
+
+
 def generate_audio_csv(dataset_name: str, subset: str, language_code: str,
-                       split: str = "train", count: int = 25):
-    print(f"📦 Loading {dataset_name}::{language_code} ({split})")
-    dataset = load_dataset(dataset_name, language_code, split=split)
-    dataset = dataset.shuffle(seed=42).select(range(count))
+                       split: str = "train", count: int = 25,
+                       seed: int = 42, streaming: bool = True,
+                       sampling: str = "shuffle_buffer",
+                       buffer_size: int = 1000, workers: int = 8):
+    """
+    Sample `count` items from a dataset split and write them as WAV files.
+
+    With `streaming=True` the split is read incrementally from the hub and
+    sampled either with a seeded shuffle buffer (`sampling="shuffle_buffer"`)
+    or with reservoir sampling over the whole split
+    (`sampling="reservoir"`). Set `streaming=False` (or HF_DATASETS_OFFLINE=1)
+    to sample from a local dataset cache without network access.
+    """
+    if os.environ.get("HF_DATASETS_OFFLINE") == "1":
+        streaming = False
+
+    print(f"📦 Loading {dataset_name}::{language_code} ({split}, "
+          f"{'streaming' if streaming else 'cached'})")
+    samples = _load_samples(dataset_name, language_code, split, count, seed,
+                            streaming, sampling, buffer_size)
 
     output_dir = f"./data/{language_code}"
     os.makedirs(output_dir, exist_ok=True)
 
-    csv_rows = []
+    # Decoding and soundfile writes are I/O and libsndfile bound, so a thread
+    # pool keeps them running in parallel. The number of in-flight items is
+    # capped so a fast download cannot pile up undecoded audio in memory.
+    csv_rows = [None] * count
+    max_in_flight = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if streaming and sampling == "reservoir":
+            return _write_reservoir(samples, count, seed, pool, output_dir,
+                                    language_code, max_in_flight)
+        pending = {}
+        for i, item in enumerate(samples):
+            audio_path = os.path.join(output_dir, f"{i + 1:03d}.wav")
+            future = pool.submit(_write_sample, item, audio_path,
+                                 language_code)
+            pending[future] = i
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    csv_rows[pending.pop(future)] = future.result()
+        for future in pending:
+            csv_rows[pending[future]] = future.result()
+    return [row for row in csv_rows if row is not None]
 
-    for i, item in enumerate(dataset):
-        # Decode and save audio
-        audio = item["audio"]
-        audio_array = audio["array"]
-        sample_rate = audio["sampling_rate"]
-
-        audio_path = os.path.join(output_dir, f"{i+1:03d}.wav")
-        sf.write(audio_path, audio_array, sample_rate)
-
-        # Collect transcript
-        transcript = item.get("transcription", item.get("sentence", ""))
-        csv_rows.append({
-            "language_code": language_code,
-            "audio_path": audio_path,
-            "transcript": transcript
-        })
-    return csv_rows
+
+def save_to_parquet(csv_rows, dataset_name: str, shard_size: int = 5000):
+    """Write the manifest as sharded Parquet; falls back to CSV when pyarrow
+    is not available."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("⚠️ pyarrow not installed, falling back to CSV manifest.")
+        return save_to_csv(csv_rows, dataset_name)
+
+    manifest_dir = f"./data/{dataset_name.replace('/', '_')}"
+    os.makedirs(manifest_dir, exist_ok=True)
+    for shard, start in enumerate(range(0, len(csv_rows), shard_size)):
+        table = pa.Table.from_pylist(csv_rows[start:start + shard_size])
+        pq.write_table(table, os.path.join(manifest_dir,
+                                           f"part-{shard:05d}.parquet"))
+
+    print(f"✅ Generated {manifest_dir} with {len(csv_rows)} samples.\n")
+    return manifest_dir
 
 
 def save_to_csv(csv_rows, dataset_name: str):
@@ -44,12 +177,14 @@ def save_to_csv(csv_rows, dataset_name: str):
     with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
         writer = csv.DictWriter(
             csvfile,
-            fieldnames=["language_code", "audio_path", "transcript"]
+            fieldnames=MANIFEST_FIELDS,
+            extrasaction="ignore"
         )
         writer.writeheader()
         writer.writerows(csv_rows)
 
     print(f"✅ Generated {csv_path} with {len(csv_rows)} samples.\n")
+    return csv_path
 
 
 if __name__ == "__main__":
@@ -62,4 +197,5 @@ if __name__ == "__main__":
             split="train",
             count=1
         )
+    save_to_parquet(csv_rows, dataset_name="google/fleurs")
     save_to_csv(csv_rows, dataset_name="google/fleurs")
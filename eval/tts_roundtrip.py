@@ -0,0 +1,190 @@
+"""
+TTS -> STT round-trip evaluation.
+
+Every text in the corpus is synthesized for each (tone, language, provider)
+combination, transcribed back with speech_to_text and scored with WER. The
+audio is kept as a synthetic STT corpus together with a manifest that
+eval_audio_transcriptions can read directly.
+
+    python -m eval.tts_roundtrip --backend local      # CI, no network
+    python -m eval.tts_roundtrip --corpus data/tts_corpus.csv
+"""
+import argparse
+import itertools
+import os
+import shutil
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import constants
+from eval.results_store import ResultsStore
+from services.text_eval import word_error_rate
+
+STT_SAMPLE_RATE = 16000
+PROVIDERS = ("Azure", "OpenAI")
+
+DEFAULT_CORPUS = {
+    "en-US": [
+        "The weather today is sunny with a light breeze from the west.",
+        "Please remind me to call the dentist tomorrow morning.",
+        "Cricket began in England and is now played all over the world.",
+    ],
+    "de-DE": [
+        "Das Wetter ist heute sonnig mit einer leichten Brise aus Westen.",
+        "Bitte erinnere mich morgen früh daran, den Zahnarzt anzurufen.",
+        "Kricket entstand in England und wird heute weltweit gespielt.",
+    ],
+}
+
+
+def load_corpus(path=None):
+    """Return {language: [text, ...]}; a CSV needs `language` and `text`."""
+    if path is None:
+        return DEFAULT_CORPUS
+    df = pd.read_csv(path)
+    return {lang: group["text"].tolist()
+            for lang, group in df.groupby("language")}
+
+
+def load_backends(backend, corpus=None):
+    if backend == "local":
+        from eval.local_backends import LocalOpenAIService, LocalSpeechService
+        return LocalSpeechService(), LocalOpenAIService(corpus=corpus)
+    from services.openai_service import OpenAIService
+    from services.speech_service import SpeechService
+    return SpeechService(play_audio=False), OpenAIService()
+
+
+def _to_stt_wav(src, dst):
+    """Copy to `dst` as 16 kHz mono WAV, resampling only when needed."""
+    with wave.open(src, "rb") as f:
+        ready = (f.getframerate() == STT_SAMPLE_RATE and
+                 f.getnchannels() == 1)
+    if ready:
+        shutil.move(src, dst)
+        return
+    from pydub import AudioSegment
+    AudioSegment.from_wav(src).set_frame_rate(STT_SAMPLE_RATE) \
+        .set_channels(1).export(dst, format="wav")
+    os.remove(src)
+
+
+def _synthesize(speech, openai, provider, text, tone, lang, voice):
+    if provider == "OpenAI":
+        profile = constants.CONVERSATION_TONE_CONFIG[tone][lang]
+        raw_path, _ = openai.speak(text=text, voice=voice,
+                                   instructions=profile["style"],
+                                   output_format="wav")
+        return raw_path
+    raw_path, _ = speech.text_to_speech(text=text, ssml_config={}, tone=tone,
+                                        lang=lang, output_format="wav")
+    return raw_path
+
+
+def run_job(speech, openai, job, out_dir, voice="nova"):
+    """Run one round-trip. Backend errors (e.g. rate limits) are recorded
+    as TTS_FAILED / STT_FAILED rows instead of aborting the batch."""
+    tone, lang, provider, idx, text = job
+    row = {"tone": tone, "provider": provider, "text_index": idx,
+           "transcript": text, "language_code": lang}
+
+    start = time.time()
+    audio_dir = os.path.join(out_dir, provider, tone, lang)
+    audio_path = os.path.join(audio_dir, f"{idx + 1:04d}.wav")
+    try:
+        raw_path = _synthesize(speech, openai, provider, text, tone, lang,
+                               voice)
+        if raw_path is not None:
+            os.makedirs(audio_dir, exist_ok=True)
+            _to_stt_wav(raw_path, audio_path)
+    except Exception as e:
+        raw_path = None
+        row["error"] = f"{type(e).__name__}: {e}"
+    tts_time = round(time.time() - start, 3)
+    if raw_path is None:
+        row["status"] = "TTS_FAILED"
+        return row, {"tts": tts_time}
+
+    try:
+        res = speech.speech_to_text(audio_path=audio_path)
+    except Exception as e:
+        row.update({"audio_path": audio_path, "status": "STT_FAILED",
+                    "error": f"{type(e).__name__}: {e}"})
+        return row, {"tts": tts_time}
+    gen_transcript = res.get("text") or ""
+    wer, wer_error = word_error_rate(text, gen_transcript)
+
+    row.update({
+        "audio_path": audio_path,
+        "gen_transcript": gen_transcript,
+        "detected_language": res.get("language"),
+        "status": res.get("status"),
+        "word_error_rate": wer,
+        "wer_error": wer_error,
+        "time_taken": round(tts_time + res.get("processing_time", 0.0), 3),
+    })
+    return row, {"tts": tts_time, "stt": res.get("processing_time", 0.0)}
+
+
+def run_roundtrip(backend="azure", corpus_path=None, tones=None,
+                  providers=PROVIDERS, out_dir="data/synthetic", workers=8):
+    corpus = load_corpus(corpus_path)
+    speech, openai = load_backends(backend, corpus)
+    tones = tones or list(constants.CONVERSATION_TONE_CONFIG.keys())
+
+    jobs = [
+        (tone, lang, provider, idx, text)
+        for tone, provider in itertools.product(tones, providers)
+        for lang, texts in corpus.items()
+        if lang in constants.CONVERSATION_TONE_CONFIG[tone]
+        for idx, text in enumerate(texts)
+    ]
+    print(f"🔁 {len(jobs)} round-trips ({backend} backend)")
+
+    manifest = []
+    with ResultsStore(service_config={"mode": "tts_roundtrip",
+                                      "backend": backend}) as store, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job, speech, openai, job, out_dir)
+                   for job in jobs]
+        for future in as_completed(futures):
+            row, timings = future.result()
+            store.append(row, language=row["language_code"], timings=timings)
+            if row.get("status") not in ("TTS_FAILED", "STT_FAILED"):
+                manifest.append(row)
+            print(f"{row['provider']:<6} {row['tone']:<10} "
+                  f"{row['language_code']}  {row['status']}  WER: "
+                  f"{row.get('word_error_rate', 'N/A')}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.csv")
+    manifest_df = pd.DataFrame(manifest)
+    if not manifest_df.empty:
+        manifest_df = manifest_df.sort_values("audio_path")
+    manifest_df.to_csv(manifest_path, index=False)
+    print(f"✅ Synthetic corpus manifest: {manifest_path}")
+    print(f"✅ Results run id: {store.run_id}")
+    return store.run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS -> STT round-trip eval")
+    parser.add_argument("--backend", choices=["azure", "local"],
+                        default="azure")
+    parser.add_argument("--corpus", help="CSV with language,text columns")
+    parser.add_argument("--tones", nargs="*")
+    parser.add_argument("--providers", nargs="*", default=list(PROVIDERS),
+                        choices=list(PROVIDERS))
+    parser.add_argument("--out-dir", default="data/synthetic")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    run_roundtrip(backend=args.backend, corpus_path=args.corpus,
+                  tones=args.tones, providers=args.providers,
+                  out_dir=args.out_dir, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
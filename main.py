@@ -1,18 +1,38 @@
 import copy
-import json
+import os
 import random
-import tempfile
+import re
 import time
+import uuid
 from datetime import datetime
 
 import streamlit as st
-from audiorecorder import audiorecorder
-from pydub import AudioSegment
-from pydub.playback import play
 
 import constants
+from services.audio_formats import DECODE_STATS, PcmPlayer, decode_audio, \
+    playable_audio
+from services.audio_spool import AudioSpool
+from services.conversation_store import ConversationStore
+from services.lazy import LazyModule
+from services.logger import get_logger, log_payload, set_correlation_id
 from services.openai_service import OpenAIService
 from services.speech_service import SpeechService
+from services.tts_router import TTSRouter
+from services.warmup import start_background_warm_up
+
+# Heavy SDKs are imported on first use (or by the background warm-up), not
+# on every cold start of the script.
+audiorecorder = LazyModule("audiorecorder")
+schemas = LazyModule("services.schemas")
+
+logger = get_logger("app")
+
+# Besides the current turn, only this many recent history turns keep their
+# audio pinned in the spool; older ones may be evicted under quota pressure.
+LIVE_AUDIO_TURNS = int(os.environ.get("AUDIO_SPOOL_LIVE_TURNS", "5"))
+
+# Conversation ids are uuid4 hex strings; anything else in ?cid= is ignored.
+CONVERSATION_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
 
 
 # ---------------------------------------
@@ -26,6 +46,25 @@ def get_speech_service():
 def get_openai_service():
     return OpenAIService()
 
+@st.cache_resource
+def get_tts_router():
+    return TTSRouter(get_speech_service(), get_openai_service())
+
+@st.cache_resource
+def get_audio_spool():
+    return AudioSpool()
+
+@st.cache_resource
+def get_conversation_store():
+    return ConversationStore()
+
+@st.cache_resource
+def start_warm_up():
+    # Runs once per process; set AI_SUITE_WARMUP=0 to disable.
+    if os.environ.get("AI_SUITE_WARMUP", "1") != "1":
+        return None
+    return start_background_warm_up([get_speech_service, get_openai_service])
+
 
 # ---------------------------------------
 # Voice Agent Class
@@ -34,13 +73,32 @@ class VoiceAgentApp:
     def __init__(self):
         self.AZURE_SYSTEM_PROMPT_BASE = constants.AZURE_SYSTEM_PROMPT_BASE
         self.OPENAI_SYSTEM_PROMPT_BASE = constants.OPENAI_SYSTEM_PROMPT_BASE
-        self.speech = get_speech_service()
-        self.openai = get_openai_service()
         self.tone_profiles = constants.CONVERSATION_TONE_CONFIG
 
+        start_warm_up()
         self.init_session_state()
         self.render_settings_panel()
 
+    @property
+    def speech(self):
+        return get_speech_service()
+
+    @property
+    def openai(self):
+        return get_openai_service()
+
+    @property
+    def tts_router(self):
+        return get_tts_router()
+
+    @property
+    def spool(self):
+        return get_audio_spool()
+
+    @property
+    def store(self):
+        return get_conversation_store()
+
     def init_session_state(self):
         default_key_paris = {
             "audio_unchanged": False,
@@ -56,10 +114,50 @@ class VoiceAgentApp:
             "prompt_tokens": None,
             "conversation_history": [],
             "tts_service": None,
+            "output_format": constants.DEFAULT_TTS_OUTPUT_FORMAT,
+            "speech_output_format": constants.DEFAULT_TTS_OUTPUT_FORMAT,
+            "stream_tts": False,
         }
         for key, value in default_key_paris.items():
             if key not in st.session_state:
                 st.session_state[key] = value
+        if "session_id" not in st.session_state:
+            # The conversation id lives in the URL so a reload resumes it.
+            conversation_id = st.query_params.get("cid", "")
+            if not CONVERSATION_ID_PATTERN.fullmatch(conversation_id):
+                conversation_id = uuid.uuid4().hex
+            st.query_params["cid"] = conversation_id
+            st.session_state.session_id = conversation_id
+            st.session_state.conversation_history = self._load_history(
+                conversation_id)
+        set_correlation_id(st.session_state.session_id[:8])
+
+    def _load_history(self, conversation_id):
+        turns = self.store.last_turns(
+            conversation_id, n=int(os.environ.get("HISTORY_RESUME_TURNS", "20")))
+        history = []
+        for turn in turns:
+            timings = turn["timings"] or {}
+            history.append({
+                "timestamp": turn["timestamp"],
+                "language": turn["language"],
+                "selected_tone": turn["tone"],
+                "selected_voice_tone": turn["voice_tone"],
+                "speech_provider": turn["tts_service"],
+                "transcript": turn["transcript"],
+                "response": turn["response"],
+                "ssml_config": turn["ssml_config"],
+                "prompt_tokens": turn["prompt_tokens"],
+                "transcription_time": timings.get("transcription"),
+                "prompt_result_time": timings.get("prompt"),
+                "speech_time": timings.get("speech"),
+                "output_path": turn["output_path"],
+                "speech_output_format": turn["output_format"],
+            })
+        if history:
+            logger.info("Resumed %d turns of conversation %s", len(history),
+                        conversation_id)
+        return history
 
     def render_settings_panel(self):
         st.sidebar.title("⚙️ Voice Assistant Settings")
@@ -81,6 +179,22 @@ class VoiceAgentApp:
                     index=0,
                     key="openai_voice_options"
                 )
+            else:
+                st.session_state.stream_tts = st.checkbox(
+                    "Stream Azure TTS (play from first chunk)",
+                    value=False,
+                    help="Plays on the server's speakers while Azure is "
+                         "still synthesizing.",
+                    key="stream_tts_setting"
+                )
+
+            formats = list(constants.TTS_OUTPUT_FORMATS.keys())
+            st.session_state.output_format = st.selectbox(
+                "Select TTS Output Format:",
+                options=formats,
+                index=formats.index(constants.DEFAULT_TTS_OUTPUT_FORMAT),
+                key="output_format_setting"
+            )
 
         with st.sidebar.expander("🗣️ Conversation Settings", expanded=True):
             st.session_state.selected_tone = st.selectbox(
@@ -100,7 +214,7 @@ class VoiceAgentApp:
         st.sidebar.markdown("---")
 
     def record_audio(self):
-        audio = audiorecorder("🎤 Start Recording", "⏹ Stop Recording")
+        audio = audiorecorder.audiorecorder("🎤 Start Recording", "⏹ Stop Recording")
         st.session_state.audio_unchanged = (audio == st.session_state.recorded_audio)
         if len(audio) > 0:
             st.session_state.recorded_audio = audio
@@ -117,12 +231,14 @@ class VoiceAgentApp:
 
         if st.session_state.audio_unchanged is False:
             with st.spinner("Transcribing..."):
-                with tempfile.NamedTemporaryFile(delete=False,
-                                                 suffix=".wav") as f:
-                    audio.export(f.name, format="wav")
-                    wav_path = f.name
-
-                result = self.speech.speech_to_text(wav_path)
+                wav_path = self.spool.allocate(st.session_state.session_id,
+                                               ".wav")
+                audio.export(wav_path, format="wav")
+                try:
+                    result = self.speech.speech_to_text(wav_path)
+                finally:
+                    # The recording itself stays in session state.
+                    self.spool.release(wav_path)
                 st.session_state.transcript = result.get("text")
                 st.session_state.transcription_time = result.get(
                     "processing_time")
@@ -132,7 +248,7 @@ class VoiceAgentApp:
                 st.toast(
                     f"🧠 Transcription Done ({result.get('processing_time')}s)")
         else:
-            print("Cached Transcript found, skipping AI call.")
+            logger.debug("Cached Transcript found, skipping AI call.")
 
         if st.session_state.transcript:
             st.write("Transcript:", st.session_state.transcript)
@@ -162,7 +278,7 @@ class VoiceAgentApp:
             chat_history=chat_history,
             language=st.session_state.language
         )
-        print(f"system_prompt : {system_prompt}")
+        log_payload(logger, "System prompt", system_prompt)
         return system_prompt
 
     def get_response(self):
@@ -172,7 +288,7 @@ class VoiceAgentApp:
             return False
 
         if st.session_state.audio_unchanged:
-            print("Cached response found, skipping AI call.")
+            logger.debug("Cached response found, skipping AI call.")
             st.write("🧠 Response:", st.session_state.response)
             return True
 
@@ -184,21 +300,30 @@ class VoiceAgentApp:
             {"role": "user", "content": transcript}
         ]
 
+        if st.session_state.tts_service == "OpenAI":
+            response_model = schemas.OpenAIAssistantReply
+        else:
+            response_model = schemas.AzureAssistantReply
+
         with st.spinner("Contacting Assistant..."):
-            result = self.openai.ask(messages=messages)
-        print(f"OpenAI response: {result}")
+            result = self.openai.ask(messages=messages,
+                                     response_model=response_model)
+        log_payload(logger, "OpenAI response", result)
 
-        result_json = json.loads(result["content"])
+        reply = result["parsed"]
+        if reply is None:
+            st.error(f"❌ Assistant reply unusable ({result['error']}).")
+            return False
 
         if st.session_state.tts_service == "OpenAI":
-            result_text = result_json.get("response")
-            ssml_config = result_json.get("instructions", "")
+            result_text = reply.response
+            ssml_config = reply.instructions
 
             st.session_state.response = result_text
             st.session_state.ssml_config = ssml_config
         else:
-            result_text = result_json.get("text")
-            ssml_config = result_json.get("ssml_config", {})
+            result_text = reply.text
+            ssml_config = reply.ssml_config.model_dump()
 
             st.session_state.response = result_text
             st.session_state.ssml_config = ssml_config
@@ -214,41 +339,123 @@ class VoiceAgentApp:
         return ssml_config
 
     def speak_response(self, ssml_config):
+        """Returns True once this turn has audio, False if synthesis failed."""
         response = st.session_state.get("response")
         if not response:
-            return
+            return False
 
         if st.session_state.audio_unchanged:
-            print("Cached TTS response found, skipping TTS call.")
-            st.audio(st.session_state.output_path, format="audio/mp3")
-            return
+            logger.debug("Cached TTS response found, skipping TTS call.")
+            st.audio(*playable_audio(st.session_state.output_path,
+                                     st.session_state.speech_output_format))
+            return True
+
+        if st.session_state.tts_service == "Azure" and \
+                st.session_state.stream_tts:
+            return self.stream_response(ssml_config)
 
         tone = st.session_state.selected_voice_tone
+        output_format = st.session_state.output_format
+        # path_factory runs on the router's worker threads, which have no
+        # Streamlit script context, so read session state here.
+        session_id = st.session_state.session_id
+        spool = self.spool
         with st.spinner("Speaking..."):
-            if st.session_state.tts_service == "OpenAI":
-                output_path, time_taken = self.openai.speak(
-                    text=response,
-                    voice=st.session_state.openai_voice_option,
-                    instructions=ssml_config
-                )
-                st.session_state.speech_time = time_taken
-                song = AudioSegment.from_mp3(output_path)
-                st.session_state.output_path = output_path
-            else:
-                output_path, time_taken = self.speech.text_to_speech(
-                    text=response,
-                    ssml_config=ssml_config,
-                    tone=tone,
-                    lang=st.session_state.language
-                )
-                song = AudioSegment.from_wav(output_path)
-                st.session_state.output_path = output_path
-                st.session_state.speech_time = time_taken
-
-            play(song)
+            provider, output_path, time_taken = self.tts_router.synthesize(
+                text=response,
+                preferred=st.session_state.tts_service,
+                voice=st.session_state.get("openai_voice_option", "nova"),
+                ssml_config=ssml_config,
+                tone=tone,
+                lang=st.session_state.language,
+                output_format=output_format,
+                path_factory=lambda suffix: spool.allocate(session_id, suffix),
+                release=spool.release
+            )
+            if output_path is None:
+                st.error("❌ Speech synthesis failed on all providers.")
+                return False
+            if provider != st.session_state.tts_service:
+                st.toast(f"↪️ Served by {provider} TTS")
+
+            st.session_state.output_path = output_path
+            self.spool.set_live(st.session_state.session_id,
+                                self._live_audio_paths())
+            self.spool.commit(output_path)
+            song = decode_audio(output_path, output_format, provider)
+            st.session_state.speech_time = time_taken
+            st.session_state.speech_first_chunk_time = None
+            st.session_state.speech_provider = provider
+            st.session_state.speech_output_format = output_format
+
+            # Raw samples go straight to the player; nothing is re-encoded.
+            with PcmPlayer(song.frame_rate, song.sample_width) as player:
+                player.write(song.set_channels(1).raw_data)
+
+        st.audio(*playable_audio(output_path, output_format))
+        st.toast(f"✅ Generating Report!")
+        return True
+
+    def stream_response(self, ssml_config):
+        """
+        Play Azure TTS from its first chunk on the server's speakers, like
+        the non-streamed path does, and keep the full audio for st.audio.
+        Browsers that should receive the chunks themselves connect to
+        /ws/synthesize on services.stream_server instead.
+        """
+        spec = constants.TTS_OUTPUT_FORMATS["pcm"]
+        output_path = self.spool.allocate(st.session_state.session_id,
+                                          spec["suffix"])
+        captions = []
+        first_chunk_time = None
+
+        start = time.time()
+        with st.spinner("Speaking..."):
+            try:
+                with open(output_path, "wb") as f, PcmPlayer(
+                        spec["sample_rate"], spec["sample_width"]) as player:
+                    for chunk in self.speech.stream_text_to_speech(
+                            text=st.session_state.response,
+                            ssml_config=ssml_config,
+                            tone=st.session_state.selected_voice_tone,
+                            lang=st.session_state.language,
+                            output_format="pcm",
+                            on_word_boundary=captions.append):
+                        if first_chunk_time is None:
+                            first_chunk_time = round(time.time() - start, 2)
+                        f.write(chunk)
+                        player.write(chunk)
+                    # Leaving the block waits for playback to finish.
+                    speech_time = round(time.time() - start, 2)
+            except RuntimeError as e:
+                self.spool.release(output_path)
+                st.error(f"❌ {e}")
+                return False
 
-        st.audio(output_path, format="audio/mp3")
+        st.session_state.update({
+            "output_path": output_path,
+            "speech_output_format": "pcm",
+            "speech_time": speech_time,
+            "speech_first_chunk_time": first_chunk_time,
+            "speech_provider": "Azure (streamed)",
+            "speech_captions": captions,
+        })
+        self.spool.set_live(st.session_state.session_id,
+                            self._live_audio_paths())
+        self.spool.commit(output_path)
+
+        st.audio(*playable_audio(output_path, "pcm"))
+        st.caption(" ".join(
+            f"{c['text']} ({c['audio_offset_ms'] / 1000:.1f}s)"
+            for c in captions))
         st.toast(f"✅ Generating Report!")
+        return True
+
+    def _live_audio_paths(self):
+        paths = [st.session_state.get("output_path")]
+        paths += [history.get("output_path") for history in
+                  st.session_state.conversation_history[:LIVE_AUDIO_TURNS]]
+        return paths
 
     def render_report(self):
         with st.expander("📋 Final Interaction Report", expanded=False):
@@ -261,18 +468,47 @@ class VoiceAgentApp:
             - **Tone Selected:** `{st.session_state.get('selected_tone', 'N/A')}`
             - **Response Time:** `{st.session_state.get('prompt_result_time', 'N/A')} sec`
             - **Tokens Used:** `{st.session_state.get('prompt_tokens', 'N/A')}`
+            - **Reply Parse Failures / Truncations:** `{self.openai.stats['parse_failures']} / {self.openai.stats['truncations']}`
 
             ### 🎙 Voice Settings
             - **Voice Tone for TTS:** `{st.session_state.get('selected_voice_tone', 'N/A')}`
             - **SSML Config:** `{st.session_state.get('ssml_config', {})}`
             - **Speech Time:** `{st.session_state.get('speech_time', 'N/A')} sec`
+            - **Served By:** `{st.session_state.get('speech_provider', 'N/A')}`
+            - **First Audio Chunk:** `{st.session_state.get('speech_first_chunk_time', 'N/A')} sec`
+            - **Output Format:** `{st.session_state.get('speech_output_format', 'N/A')}`
+            - **Audio Bytes / Decode Time per Format:** `{DECODE_STATS}`
+            - **TTS Provider Health:** `{self.tts_router.snapshot()}`
+            - **Audio Spool:** `{self.spool.snapshot()}`
             """)
 
     def append_conversation_history(self, convo_timestamp):
-        convo_log = copy.deepcopy(st.session_state.to_dict())
+        state = st.session_state.to_dict()
+        # Earlier turns are already in the history; copying them into every
+        # entry would make each turn as large as all previous ones combined.
+        state.pop("conversation_history", None)
+        convo_log = copy.deepcopy(state)
         convo_log["timestamp"] = convo_timestamp
         st.session_state.conversation_history = [convo_log] + st.session_state.conversation_history
-        print("Added.")
+        self.store.append_turn(st.session_state.session_id, {
+            "timestamp": str(convo_timestamp),
+            "language": convo_log.get("language"),
+            "tone": convo_log.get("selected_tone"),
+            "voice_tone": convo_log.get("selected_voice_tone"),
+            "tts_service": convo_log.get("speech_provider"),
+            "transcript": convo_log.get("transcript"),
+            "response": convo_log.get("response"),
+            "ssml_config": convo_log.get("ssml_config"),
+            "prompt_tokens": convo_log.get("prompt_tokens"),
+            "timings": {
+                "transcription": convo_log.get("transcription_time"),
+                "prompt": convo_log.get("prompt_result_time"),
+                "speech": convo_log.get("speech_time"),
+            },
+            "output_path": convo_log.get("output_path"),
+            "output_format": convo_log.get("speech_output_format"),
+        })
+        logger.debug("Added turn to conversation history.")
 
     def render_history(self):
         if st.session_state.conversation_history:
@@ -298,9 +534,13 @@ class VoiceAgentApp:
                         - **SSML Config:** `{history.get('ssml_config', {})}`
                         - **Speech Time:** `{history.get('speech_time', 'N/A')} sec`
                     """)
-                    if history.get('output_path'):
-                        st.audio(history.get('output_path', None),
-                                 format="audio/mp3")
+                    if history.get('output_path') and os.path.exists(
+                            history['output_path']):
+                        self.spool.touch(history['output_path'])
+                        st.audio(*playable_audio(
+                            history.get('output_path'),
+                            history.get('speech_output_format') or
+                            constants.DEFAULT_TTS_OUTPUT_FORMAT))
                     st.markdown("---")
 
     def run(self):
@@ -315,8 +555,8 @@ class VoiceAgentApp:
         # if user_input:
         #     st.session_state.transcript = user_input
         #     convo_timestamp = datetime.now()
-        #     if ssml_config := self.get_response():
-        #         self.speak_response(ssml_config)
+        #     ssml_config = self.get_response()
+        #     if ssml_config and self.speak_response(ssml_config):
         #         self.render_report()
         #         self.append_conversation_history(convo_timestamp)
 
@@ -324,10 +564,13 @@ class VoiceAgentApp:
             if self.record_audio():
                 convo_timestamp = datetime.now()
                 if self.transcribe_audio():
-                    if ssml_config := self.get_response():
-                        self.speak_response(ssml_config)
+                    ssml_config = self.get_response()
+                    if ssml_config and self.speak_response(ssml_config):
                         self.render_report()
-                        self.append_conversation_history(convo_timestamp)
+                        # Reruns with the same recording replay the cached
+                        # turn; it is already in the history and the store.
+                        if not st.session_state.audio_unchanged:
+                            self.append_conversation_history(convo_timestamp)
 
         self.render_history()
 
@@ -335,6 +578,6 @@ class VoiceAgentApp:
 # Main
 # ---------------------------------------
 if __name__ == "__main__":
-    print("Initializing AI Voice Assistant...")
+    logger.info("Initializing AI Voice Assistant...")
     app = VoiceAgentApp()
     app.run()
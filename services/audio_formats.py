@@ -0,0 +1,133 @@
+import io
+import os
+import subprocess
+import threading
+import time
+import wave
+
+import constants
+from services.lazy import LazyModule
+from services.logger import get_logger
+
+pydub = LazyModule("pydub")
+
+logger = get_logger("audio_formats")
+
+_stats_lock = threading.Lock()
+DECODE_STATS = {}
+
+
+def format_spec(output_format):
+    return constants.TTS_OUTPUT_FORMATS[output_format]
+
+
+def _record(label, size, decode_time):
+    with _stats_lock:
+        stats = DECODE_STATS.setdefault(
+            label, {"files": 0, "bytes": 0, "decode_s": 0.0})
+        stats["files"] += 1
+        stats["bytes"] += size
+        stats["decode_s"] = round(stats["decode_s"] + decode_time, 4)
+
+
+def decode_audio(path, output_format, provider=None):
+    """
+    Load a TTS output file as a pydub AudioSegment.
+
+    WAV and raw PCM are parsed in-process; only compressed formats go
+    through ffmpeg. Bytes and decode time are accumulated in DECODE_STATS
+    under "<provider>:<format>", using the format the provider actually
+    produced (OpenAI has a single mp3 bitrate, for example).
+    """
+    spec = format_spec(output_format)
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+    if spec["decoder"] == "pcm":
+        with open(path, "rb") as f:
+            song = pydub.AudioSegment(
+                data=f.read(),
+                sample_width=spec["sample_width"],
+                frame_rate=spec["sample_rate"],
+                channels=spec["channels"]
+            )
+    elif spec["decoder"] == "wav":
+        song = pydub.AudioSegment.from_wav(path)
+    else:
+        song = pydub.AudioSegment.from_file(path)
+    label = output_format
+    if provider == "OpenAI":
+        label = spec["openai"]
+    if provider:
+        label = f"{provider}:{label}"
+    _record(label, size, time.perf_counter() - start)
+    return song
+
+
+def pcm_to_wav_bytes(pcm, sample_rate=24000, sample_width=2, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(sample_width)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def playable_audio(path, output_format):
+    """Return (data, mime) for st.audio; raw PCM gets a WAV header."""
+    spec = format_spec(output_format)
+    if spec["decoder"] != "pcm":
+        return path, spec["mime"]
+    with open(path, "rb") as f:
+        return pcm_to_wav_bytes(f.read(), spec["sample_rate"],
+                                spec["sample_width"],
+                                spec["channels"]), spec["mime"]
+
+
+class PcmPlayer:
+    """
+    Plays raw mono PCM on the server's audio device while it is written.
+
+    A single ffplay process reads the whole stream from a pipe, so playback
+    starts with the first chunk and has no gaps between chunks. Without
+    ffplay on PATH the writes are dropped.
+    """
+
+    def __init__(self, sample_rate=24000, sample_width=2):
+        self._proc = None
+        try:
+            self._proc = subprocess.Popen(
+                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet",
+                 "-f", f"s{sample_width * 8}le", "-ar", str(sample_rate),
+                 "-i", "-"],
+                stdin=subprocess.PIPE
+            )
+        except OSError as e:
+            logger.warning("Live playback unavailable: %s", e)
+
+    def write(self, chunk):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.write(chunk)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            logger.warning("Live playback stopped early.")
+            self._proc = None
+
+    def close(self):
+        """Wait for the buffered audio to finish playing."""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._proc.wait()
+        self._proc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,198 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+MB = 1024 * 1024
+DEFAULT_GLOBAL_QUOTA = 500 * MB
+# Never plan to fill more than this share of the spool's filesystem.
+MAX_FILESYSTEM_SHARE = 0.5
+
+
+def _default_root():
+    # tmpfs keeps short-lived audio off the disk, but only if it is big
+    # enough for the quota (Docker's default /dev/shm is just 64 MB); fall
+    # back to the temp dir otherwise.
+    base = tempfile.gettempdir()
+    if os.path.isdir("/dev/shm") and shutil.disk_usage("/dev/shm").total * \
+            MAX_FILESYSTEM_SHARE >= DEFAULT_GLOBAL_QUOTA:
+        base = "/dev/shm"
+    return os.path.join(base, "ai-suite-audio")
+
+
+def _default_global_quota(root):
+    total = shutil.disk_usage(root).total
+    return min(DEFAULT_GLOBAL_QUOTA, int(total * MAX_FILESYSTEM_SHARE))
+
+
+class AudioSpool:
+    """
+    Owns every audio artifact the app writes (recordings sent to STT, TTS
+    output) under one directory.
+
+    Files are tracked per session in LRU order. When a session or the whole
+    spool goes over its byte quota, the least recently used files that no
+    live history turn references are deleted. Sessions idle for longer than
+    `session_ttl` seconds are treated as ended and removed entirely. Files
+    left under `root` by an earlier process are indexed on startup.
+
+    Without AUDIO_SPOOL_GLOBAL_MB the global quota is 500 MB, capped at
+    half of the filesystem the spool lives on.
+    """
+
+    def __init__(self, root=None, session_quota=None, global_quota=None,
+                 session_ttl=None):
+        self.root = root or os.environ.get("AUDIO_SPOOL_DIR", _default_root())
+        os.makedirs(self.root, exist_ok=True)
+        if global_quota is None and os.environ.get("AUDIO_SPOOL_GLOBAL_MB"):
+            global_quota = int(float(os.environ["AUDIO_SPOOL_GLOBAL_MB"]) * MB)
+        self.global_quota = global_quota or _default_global_quota(self.root)
+        self.session_quota = min(self.global_quota, session_quota or int(
+            float(os.environ.get("AUDIO_SPOOL_SESSION_MB", "50")) * MB))
+        self.session_ttl = session_ttl or float(os.environ.get(
+            "AUDIO_SPOOL_SESSION_TTL", "3600"))
+
+        self._lock = threading.RLock()
+        # path -> {"session": ..., "size": ...}, least recently used first
+        self._files = OrderedDict()
+        self._live = {}
+        self._last_seen = {}
+        self.stats = {"evictions": 0, "evicted_bytes": 0,
+                      "sessions_ended": 0}
+        self._index_existing()
+
+    def _index_existing(self):
+        files = []
+        for session_id in os.listdir(self.root):
+            session_dir = os.path.join(self.root, session_id)
+            if not os.path.isdir(session_dir):
+                continue
+            for name in os.listdir(session_dir):
+                path = os.path.join(session_dir, name)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_size == 0:
+                        # Allocated by a process that died before writing.
+                        os.remove(path)
+                        continue
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path, session_id, stat.st_size))
+        with self._lock:
+            for mtime, path, session_id, size in sorted(files):
+                self._files[path] = {"session": session_id, "size": size}
+                self._last_seen[session_id] = max(
+                    mtime, self._last_seen.get(session_id, 0))
+            self._expire_idle_sessions()
+            self._enforce(None)
+
+    def _session_dir(self, session_id):
+        # Session ids end up in paths that are later removed with rmtree, so
+        # each must resolve to a direct child of the spool root.
+        root = os.path.realpath(self.root)
+        session_dir = os.path.realpath(os.path.join(root, str(session_id)))
+        if os.path.dirname(session_dir) != root:
+            raise ValueError(f"Invalid spool session id: {session_id!r}")
+        return session_dir
+
+    def allocate(self, session_id, suffix=".wav"):
+        """Reserve a new file path for `session_id`."""
+        session_dir = self._session_dir(session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=session_dir)
+        os.close(fd)
+        with self._lock:
+            self._files[path] = {"session": session_id, "size": 0}
+            self._last_seen[session_id] = time.time()
+        return path
+
+    def commit(self, path):
+        """Record the final size of a written file and enforce quotas."""
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is None:
+                return
+            try:
+                entry["size"] = os.path.getsize(path)
+            except OSError:
+                del self._files[path]
+                return
+            self._files.move_to_end(path)
+            self._last_seen[entry["session"]] = time.time()
+            self._expire_idle_sessions()
+            self._enforce(entry["session"])
+
+    def touch(self, path):
+        with self._lock:
+            if path in self._files:
+                self._files.move_to_end(path)
+
+    def release(self, path):
+        """Delete a file that is no longer needed."""
+        with self._lock:
+            self._files.pop(path, None)
+        self._remove(path)
+
+    def set_live(self, session_id, paths):
+        """Paths still referenced by the session's history; never evicted."""
+        self._session_dir(session_id)
+        with self._lock:
+            self._live[session_id] = {p for p in paths if p}
+            self._last_seen[session_id] = time.time()
+
+    def end_session(self, session_id):
+        session_dir = self._session_dir(session_id)
+        with self._lock:
+            for path in [p for p, e in self._files.items()
+                         if e["session"] == session_id]:
+                del self._files[path]
+            self._live.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+            self.stats["sessions_ended"] += 1
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats,
+                        files=len(self._files),
+                        bytes=sum(e["size"] for e in self._files.values()),
+                        sessions=len(self._last_seen))
+
+    def _expire_idle_sessions(self):
+        now = time.time()
+        for session_id, seen in list(self._last_seen.items()):
+            if now - seen > self.session_ttl:
+                self.end_session(session_id)
+
+    def _enforce(self, session_id):
+        session_bytes = sum(e["size"] for e in self._files.values()
+                            if e["session"] == session_id)
+        total_bytes = sum(e["size"] for e in self._files.values())
+        for path, entry in list(self._files.items()):
+            if (session_bytes <= self.session_quota and
+                    total_bytes <= self.global_quota):
+                break
+            over_session = (entry["session"] == session_id and
+                            session_bytes > self.session_quota)
+            if not over_session and total_bytes <= self.global_quota:
+                continue
+            # Size 0 means allocated but still being written.
+            if entry["size"] == 0 or path in self._live.get(
+                    entry["session"], ()):
+                continue
+            del self._files[path]
+            self._remove(path)
+            self.stats["evictions"] += 1
+            self.stats["evicted_bytes"] += entry["size"]
+            total_bytes -= entry["size"]
+            if entry["session"] == session_id:
+                session_bytes -= entry["size"]
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
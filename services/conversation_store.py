@@ -0,0 +1,135 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from services.logger import get_logger
+
+logger = get_logger("conversation_store")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    timestamp TEXT,
+    language TEXT,
+    tone TEXT,
+    voice_tone TEXT,
+    tts_service TEXT,
+    transcript TEXT,
+    response TEXT,
+    ssml_config TEXT,
+    timings TEXT,
+    prompt_tokens INTEGER,
+    output_path TEXT,
+    output_format TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_turns_conversation
+    ON turns (conversation_id, created_at DESC);
+"""
+
+COLUMNS = ("conversation_id", "created_at", "timestamp", "language", "tone",
+           "voice_tone", "tts_service", "transcript", "response",
+           "ssml_config", "timings", "prompt_tokens", "output_path",
+           "output_format")
+JSON_COLUMNS = ("ssml_config", "timings")
+
+_STOP = object()
+
+
+class ConversationStore:
+    """
+    SQLite-backed log of conversation turns.
+
+    `append_turn` only enqueues; a writer thread commits queued turns in
+    batches so the request thread never waits on disk. Reads go through
+    the (conversation_id, created_at) index.
+    """
+
+    def __init__(self, path=None, batch_size=50, flush_interval=0.5):
+        self.path = path or os.environ.get("CONVERSATION_DB_PATH",
+                                           "static/conversations.db")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._queue = queue.Queue()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name="conversation-store",
+                                        daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        # sqlite3 connections are bound to the thread that created them.
+        if getattr(self._local, "conn", None) is None:
+            self._local.conn = self._connect()
+        return self._local.conn
+
+    def append_turn(self, conversation_id, turn):
+        row = dict(turn, conversation_id=conversation_id,
+                   created_at=turn.get("created_at", time.time()))
+        for col in JSON_COLUMNS:
+            row[col] = json.dumps(row.get(col), default=str)
+        self._queue.put(tuple(row.get(col) for col in COLUMNS))
+
+    def last_turns(self, conversation_id, n=10):
+        """Most recent `n` turns of a conversation, newest first."""
+        rows = self._reader().execute(
+            "SELECT * FROM turns WHERE conversation_id = ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (conversation_id, n)
+        ).fetchall()
+        turns = []
+        for row in rows:
+            turn = dict(row)
+            for col in JSON_COLUMNS:
+                turn[col] = json.loads(turn[col]) if turn[col] else None
+            turns.append(turn)
+        return turns
+
+    def flush(self):
+        """Block until every queued turn has been committed."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        insert = (f"INSERT INTO turns ({', '.join(COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * len(COLUMNS))})")
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(
+                        timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+            rows = [item for item in batch if item is not _STOP]
+            stop = len(rows) != len(batch)
+            try:
+                with conn:
+                    conn.executemany(insert, rows)
+            except sqlite3.Error as e:
+                logger.error("Failed to persist %d turns: %s", len(rows), e)
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
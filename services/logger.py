@@ -0,0 +1,85 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+
+ROOT_LOGGER = "ai_suite"
+LOG_FORMAT = ("%(asctime)s %(levelname)-7s [%(correlation_id)s] "
+              "%(name)s: %(message)s")
+
+correlation_id = contextvars.ContextVar("correlation_id", default="-")
+
+_configure_lock = threading.Lock()
+_listener = None
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamps records with the correlation id of the calling context."""
+
+    def filter(self, record):
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+def configure_logging(level=None):
+    """
+    Route every `ai_suite.*` logger through a queue to a background thread.
+
+    The request thread only enqueues the record; formatting and stream I/O
+    happen on the listener thread. Safe to call on every Streamlit rerun.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        level = level or os.environ.get("LOG_LEVEL", "INFO")
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(CorrelationFilter())
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level.upper())
+        root.addHandler(queue_handler)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def set_correlation_id(value):
+    correlation_id.set(value or "-")
+
+
+def log_payload(logger, label, payload, sample_rate=None, max_chars=None):
+    """
+    Debug-level dump of a large payload (prompts, SSML, raw responses).
+
+    Skipped entirely unless DEBUG is enabled, then sampled with
+    LOG_PAYLOAD_SAMPLE_RATE and truncated to LOG_PAYLOAD_MAX_CHARS so a
+    busy instance cannot flood its log stream.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", "1.0"))
+    if random.random() >= sample_rate:
+        return
+    if max_chars is None:
+        max_chars = int(os.environ.get("LOG_PAYLOAD_MAX_CHARS", "4000"))
+    text = str(payload)
+    if len(text) > max_chars:
+        text = f"{text[:max_chars]}... [{len(text) - max_chars} more chars]"
+    logger.debug("%s: %s", label, text)
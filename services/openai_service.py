@@ -2,29 +2,71 @@ import os
 import tempfile
 import time
 
-from openai import AzureOpenAI
-from pydub import AudioSegment
-from pydub.playback import play
+import constants
+from services.lazy import LazyModule
+from services.logger import get_logger, log_payload
+
+openai = LazyModule("openai")
+pydantic = LazyModule("pydantic")
+pydub = LazyModule("pydub")
+pydub_playback = LazyModule("pydub.playback")
+
+logger = get_logger("openai_service")
+
+# JSON keys and the SSML config take room on top of the spoken reply, so the
+# structured path gets a larger budget than a plain completion.
+DEFAULT_MAX_TOKENS = 300
+STRUCTURED_MAX_TOKENS = int(os.environ.get("OPENAI_STRUCTURED_MAX_TOKENS",
+                                           "800"))
 
 
 class OpenAIService:
     def __init__(self):
         self.deployment = os.environ["OPENAI_DEPLOYMENT_NAME"]
+        self.stats = {
+            "structured_requests": 0,
+            "parse_failures": 0,
+            "truncations": 0,
+            "refusals": 0,
+        }
+        self._client = None
+
+    @property
+    def client(self):
+        # One client per service keeps the HTTP connection pool warm across
+        # turns instead of re-handshaking on every call.
+        if self._client is None:
+            self._client = openai.AzureOpenAI(
+                api_key=os.environ["OPENAI_API_KEY"],
+                azure_endpoint=os.environ["OPENAI_BASE_URL"],
+                api_version=os.environ["OPENAI_API_VERSION"]
+            )
+        return self._client
 
-    def ask(self, messages, temperature=0.5, max_tokens=300):
-        print("-" * 100)
-        print(f"Asking OpenAI API...: {messages}")
+    def warm_up(self):
+        """Import the SDK and open a pooled connection to the endpoint."""
+        try:
+            self.client.with_options(timeout=10).models.list()
+        except openai.APIError:
+            # Any HTTP answer means TLS is up; the status does not matter.
+            pass
+
+    def ask(self, messages, temperature=0.5, max_tokens=None,
+            response_model=None):
+        logger.info("Asking OpenAI API (%d messages)...", len(messages))
+        log_payload(logger, "Messages", messages)
         start_time = time.time()
-        client = AzureOpenAI(
-            api_key=os.environ["OPENAI_API_KEY"],
-            azure_endpoint=os.environ["OPENAI_BASE_URL"],
-            api_version=os.environ["OPENAI_API_VERSION"]
-        )
+        client = self.client
+        if response_model is not None:
+            return self._ask_structured(client, messages, temperature,
+                                        max_tokens or STRUCTURED_MAX_TOKENS,
+                                        response_model, start_time)
+
         response = client.chat.completions.create(
             model=self.deployment,
             messages=messages,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens or DEFAULT_MAX_TOKENS
         )
         return {
             "time_taken": round(time.time() - start_time, 2),
@@ -32,25 +74,96 @@ class OpenAIService:
             "content": response.choices[0].message.content
         }
 
-    def speak(self, text, voice="nova", instructions=None):
-        start_time = time.time()
-        client = AzureOpenAI(
-            api_key=os.environ["OPENAI_API_KEY"],
-            azure_endpoint=os.environ["OPENAI_BASE_URL"],
-            api_version=os.environ["OPENAI_API_VERSION"]
+    def _ask_structured(self, client, messages, temperature, max_tokens,
+                        response_model, start_time):
+        """
+        Ask with `response_model` passed as a strict JSON schema and return
+        the reply already validated into that pydantic model under "parsed".
+        A truncated reply is retried once with twice the token budget.
+        On truncation, refusal or a schema mismatch "parsed" is None and
+        "error" says why; the matching counter in `self.stats` is bumped.
+        """
+        self.stats["structured_requests"] += 1
+        resp = {"parsed": None, "error": None, "tokens": None,
+                "content": None}
+        try:
+            try:
+                response = self._parse(client, messages, temperature,
+                                       max_tokens, response_model)
+            except openai.LengthFinishReasonError as e:
+                self.stats["truncations"] += 1
+                resp["tokens"] = self._usage_tokens(e.completion)
+                logger.warning("Reply truncated at %d tokens, retrying with "
+                               "%d", max_tokens, max_tokens * 2)
+                response = self._parse(client, messages, temperature,
+                                       max_tokens * 2, response_model)
+        except openai.LengthFinishReasonError as e:
+            self.stats["truncations"] += 1
+            resp["error"] = "truncated"
+            resp["tokens"] = self._add_tokens(resp["tokens"],
+                                              self._usage_tokens(e.completion))
+        except openai.ContentFilterFinishReasonError:
+            self.stats["refusals"] += 1
+            resp["error"] = "content_filter"
+        except pydantic.ValidationError as e:
+            self.stats["parse_failures"] += 1
+            resp["error"] = f"invalid_response: {e.error_count()} errors"
+        else:
+            message = response.choices[0].message
+            resp.update({
+                "tokens": self._add_tokens(resp["tokens"],
+                                           self._usage_tokens(response)),
+                "content": message.content,
+                "parsed": message.parsed,
+            })
+            if message.refusal:
+                self.stats["refusals"] += 1
+                resp["error"] = "refusal"
+
+        resp["time_taken"] = round(time.time() - start_time, 2)
+        return resp
+
+    def _parse(self, client, messages, temperature, max_tokens,
+               response_model):
+        return client.beta.chat.completions.parse(
+            model=self.deployment,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_model
         )
+
+    @staticmethod
+    def _usage_tokens(completion):
+        usage = getattr(completion, "usage", None)
+        return usage.total_tokens if usage is not None else None
+
+    @staticmethod
+    def _add_tokens(total, tokens):
+        if total is None:
+            return tokens
+        return total + (tokens or 0)
+
+    def speak(self, text, voice="nova", instructions=None,
+              output_format="mp3_96k", output_path=None):
+        start_time = time.time()
+        spec = constants.TTS_OUTPUT_FORMATS[output_format]
+        client = self.client
         response = client.audio.speech.create(
             model=os.environ["OPENAI_TTS_MODEL"],
             voice=voice,
             input=text,
-            instructions=instructions
+            instructions=instructions,
+            response_format=spec["openai"]
         )
         time_taken = round(time.time() - start_time)
-        output_path = tempfile.mktemp(suffix=".mp3")
+        if output_path is None:
+            fd, output_path = tempfile.mkstemp(suffix=spec["suffix"])
+            os.close(fd)
         with open(output_path, "wb") as f:
             f.write(response.content)
 
-        print(f"✅ Audio saved to: {output_path}")
+        logger.info("Audio saved to: %s", output_path)
         return output_path, time_taken
 
 
@@ -62,5 +175,5 @@ if __name__ == "__main__":
     began in England… now played all over the world."""
     )
     print(f"Audio file created at: {audio_path}")
-    song = AudioSegment.from_mp3(audio_path)
-    play(song)
+    song = pydub.AudioSegment.from_mp3(audio_path)
+    pydub_playback.play(song)
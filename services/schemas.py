@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class _StrictModel(BaseModel):
+    # Structured outputs require every property to be listed and no extras.
+    model_config = ConfigDict(extra="forbid")
+
+
+class SSMLConfig(_StrictModel):
+    rate: str
+    pitch: str
+    volume: str
+    style: str
+
+
+class AzureAssistantReply(_StrictModel):
+    """Reply contract of AZURE_SYSTEM_PROMPT_BASE."""
+    text: str
+    ssml_config: SSMLConfig
+
+
+class OpenAIAssistantReply(_StrictModel):
+    """Reply contract of OPENAI_SYSTEM_PROMPT_BASE."""
+    response: str
+    instructions: str
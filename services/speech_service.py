@@ -1,15 +1,53 @@
 import html
 import os
+import queue
 import re
 import tempfile
+import threading
 import time
 
-import azure.cognitiveservices.speech as speechsdk
-from azure.cognitiveservices.speech import AutoDetectSourceLanguageConfig
-from pydub import AudioSegment
-from pydub.playback import play
-
 import constants
+from services.lazy import LazyModule
+from services.logger import get_logger, log_payload
+
+speechsdk = LazyModule("azure.cognitiveservices.speech")
+pydub = LazyModule("pydub")
+pydub_playback = LazyModule("pydub.playback")
+
+logger = get_logger("speech_service")
+
+
+class StreamingRecognition:
+    """
+    A live continuous-recognition session fed from a PushAudioInputStream.
+
+    Call `write` with 16-bit mono PCM frames as they are captured and
+    `close` once the speaker is done; `close` waits for the recognizer to
+    flush and returns the final transcript.
+    """
+
+    def __init__(self, recognizer, push_stream):
+        self.recognizer = recognizer
+        self.push_stream = push_stream
+        self.transcripts = []
+        self.language = None
+        self.stopped = threading.Event()
+        self.closed = False
+
+    def write(self, frame):
+        self.push_stream.write(frame)
+
+    def close(self, timeout=15):
+        if not self.closed:
+            self.closed = True
+            self.push_stream.close()
+            self.stopped.wait(timeout)
+            self.recognizer.stop_continuous_recognition()
+        return {
+            "status": "COMPLETED" if self.transcripts else "NO_SPEECH",
+            "text": " ".join(self.transcripts),
+            "language": self.language,
+        }
 
 
 class SpeechService:
@@ -22,6 +60,24 @@ class SpeechService:
         self.play_audio = play_audio
         self.method = method.upper()
         self.TONE_PROFILES = constants.CONVERSATION_TONE_CONFIG
+        # speech_config is shared, so setting the output format and building
+        # the synthesizer from it must not interleave between requests.
+        self._synth_lock = threading.Lock()
+
+    def warm_up(self):
+        """
+        Load the native SDK and make one throwaway synthesis connection.
+
+        Requests still build their own synthesizer (output file and format
+        differ per call) and open their own connection; this only moves the
+        native library load and the first DNS lookup / TLS setup off the
+        first user turn.
+        """
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=self.speech_config, audio_config=None)
+        connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        connection.open(True)
+        connection.close()
 
     def clean_text(self, text):
         if not text:
@@ -67,23 +123,29 @@ class SpeechService:
 
         return text
 
-    def text_to_speech(self, text, ssml_config, tone="friendly", lang="en-US"):
-        print("-" * 100)
-        print("Converting text to speech...")
+    def _synthesizer(self, output_format, audio_config):
+        spec = constants.TTS_OUTPUT_FORMATS[output_format]
+        with self._synth_lock:
+            self.speech_config.set_speech_synthesis_output_format(
+                getattr(speechsdk.SpeechSynthesisOutputFormat, spec["azure"]))
+            return speechsdk.SpeechSynthesizer(
+                speech_config=self.speech_config, audio_config=audio_config)
 
-        config = self.TONE_PROFILES.get(tone, self.TONE_PROFILES["friendly"])[
-            lang]
+    def build_ssml(self, text, ssml_config, tone="friendly", lang="en-US"):
+        # Copy so per-request overrides never leak into the shared profiles.
+        config = dict(self.TONE_PROFILES.get(
+            tone, self.TONE_PROFILES["friendly"])[lang])
 
-        print(f"Default config: {config}")
-        print(f"SSML config: {ssml_config}")
+        log_payload(logger, "Default config", config)
+        log_payload(logger, "SSML config", ssml_config)
 
-        config.update(ssml_config)
+        config.update(ssml_config or {})
         ssml = f"""
         <speak version='1.0' xml:lang='{lang}'
                xmlns='http://www.w3.org/2001/10/synthesis'
                xmlns:mstts='https://www.w3.org/2001/mstts'>
             <voice name='{config["voice"]}'>
-                <prosody rate='{config["rate"]}' pitch='{config["pitch"]}' volume='{config["volume"]}'>
+                <prosody rate='{config["rate"]}' pitch='{config["pitch"]}' volume='{config.get("volume", "medium")}'>
                     <mstts:express-as style='{config["style"]}'>
                         {self.clean_text(text)}
                     </mstts:express-as>
@@ -91,31 +153,94 @@ class SpeechService:
             </voice>
         </speak>
         """
-        print("SSML:", ssml)
+        log_payload(logger, "SSML", ssml)
+        return ssml
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as f:
-            output_path = f.name
-        audio_config = speechsdk.audio.AudioOutputConfig(
-            use_default_speaker=True, filename=output_path)
+    def text_to_speech(self, text, ssml_config, tone="friendly", lang="en-US",
+                       output_format="wav", output_path=None):
+        logger.info("Converting text to speech (tone=%s, lang=%s)", tone, lang)
+        ssml = self.build_ssml(text, ssml_config, tone=tone, lang=lang)
 
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=self.speech_config, audio_config=audio_config)
+        # A caller-supplied path belongs to the caller, who cleans it up.
+        owns_path = output_path is None
+        if owns_path:
+            suffix = constants.TTS_OUTPUT_FORMATS[output_format]["suffix"]
+            with tempfile.NamedTemporaryFile(delete=False,
+                                             suffix=suffix) as f:
+                output_path = f.name
+        audio_config = speechsdk.audio.AudioOutputConfig(filename=output_path)
+
+        synthesizer = self._synthesizer(output_format, audio_config)
 
         start = time.time()
         result = synthesizer.speak_ssml_async(ssml).get()
         time_taken = round(time.time() - start, 2)
 
         if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            print("✅ Speech synthesized successfully.")
+            logger.info("Speech synthesized in %ss", time_taken)
             return output_path, time_taken
         elif result.reason == speechsdk.ResultReason.Canceled:
             cancellation = result.cancellation_details
-            print("❌ Speech synthesis canceled:", cancellation.reason)
+            logger.error("Speech synthesis canceled: %s",
+                         cancellation.reason)
+        if owns_path:
+            os.remove(output_path)
         return None, time_taken
 
+    def stream_text_to_speech(self, text, ssml_config, tone="friendly",
+                              lang="en-US", output_format="pcm",
+                              on_word_boundary=None):
+        """
+        Synthesize and yield audio chunks as the service produces them.
+
+        Chunks come from the synthesizer's `synthesizing` events, so the
+        first one arrives long before the whole utterance is done. With the
+        default raw PCM format the chunks can be played back-to-back.
+        `on_word_boundary(event)` receives a dict with the word, its text
+        offset and its audio offset/duration in ms for caption sync.
+        """
+        logger.info("Streaming text to speech (tone=%s, lang=%s)", tone, lang)
+        ssml = self.build_ssml(text, ssml_config, tone=tone, lang=lang)
+        chunks = queue.Queue()
+        synthesizer = self._synthesizer(output_format, audio_config=None)
+
+        def synthesizing_handler(evt):
+            chunks.put(evt.result.audio_data)
+
+        def word_boundary_handler(evt):
+            on_word_boundary({
+                "text": evt.text,
+                "text_offset": evt.text_offset,
+                "word_length": evt.word_length,
+                # audio_offset is in 100ns ticks
+                "audio_offset_ms": evt.audio_offset / 10000,
+                "duration_ms": evt.duration.total_seconds() * 1000,
+            })
+
+        def canceled_handler(evt):
+            chunks.put(RuntimeError(
+                f"Speech synthesis canceled: "
+                f"{evt.result.cancellation_details.reason}"))
+
+        synthesizer.synthesizing.connect(synthesizing_handler)
+        if on_word_boundary:
+            synthesizer.synthesis_word_boundary.connect(word_boundary_handler)
+        synthesizer.synthesis_completed.connect(lambda evt: chunks.put(None))
+        synthesizer.synthesis_canceled.connect(canceled_handler)
+
+        result_future = synthesizer.speak_ssml_async(ssml)
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            if isinstance(chunk, Exception):
+                logger.error("%s", chunk)
+                raise chunk
+            yield chunk
+        result_future.get()
+
     def speech_to_text(self, audio_path):
-        print("-" * 100)
-        print("Converting speech to text...")
+        logger.info("Converting speech to text...")
 
         audio_cfg = speechsdk.audio.AudioConfig(filename=audio_path)
 
@@ -131,7 +256,7 @@ class SpeechService:
         recognizer = speechsdk.SpeechRecognizer(
             speech_config=self.speech_config,
             audio_config=audio_cfg,
-            auto_detect_source_language_config=AutoDetectSourceLanguageConfig(
+            auto_detect_source_language_config=speechsdk.AutoDetectSourceLanguageConfig(
                 languages=self.languages)
         )
 
@@ -145,10 +270,10 @@ class SpeechService:
         resp["processing_time"] = round(time.time() - start, 2)
 
         if self.play_audio:
-            print("Playing audio file: {}".format(audio_path))
-            song = AudioSegment.from_wav(audio_path)
+            logger.info("Playing audio file: %s", audio_path)
+            song = pydub.AudioSegment.from_wav(audio_path)
             while True:
-                play(song)
+                pydub_playback.play(song)
                 accurate = input("Is) it accurate? (1/0): ")
                 if accurate in ("0", "1"):
                     break
@@ -186,7 +311,8 @@ class SpeechService:
         resp = {}
 
         if speech_recognition_result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            print("Recognized: {}".format(speech_recognition_result.text))
+            log_payload(logger, "Recognized",
+                        speech_recognition_result.text)
             resp.update({
                 "status": "Completed",
                 "text": speech_recognition_result.text,
@@ -195,20 +321,19 @@ class SpeechService:
                 )
             })
         elif speech_recognition_result.reason == speechsdk.ResultReason.NoMatch:
-            print("No speech could be recognized: {}".format(
-                speech_recognition_result.no_match_details))
+            logger.warning("No speech could be recognized: %s",
+                           speech_recognition_result.no_match_details)
             resp["status"] = "NoSpeech"
         elif speech_recognition_result.reason == speechsdk.ResultReason.Canceled:
             cancellation_details = speech_recognition_result.cancellation_details
-            print("Speech Recognition canceled: {}".format(
-                cancellation_details.reason))
+            logger.warning("Speech Recognition canceled: %s",
+                           cancellation_details.reason)
             resp["status"] = "Canceled"
             if cancellation_details.reason == speechsdk.CancellationReason.Error:
                 resp["status"] = "Error"
-                print("Error details: {}".format(
-                    cancellation_details.error_details))
-                print(
-                    "Did you set the speech resource key and endpoint values?")
+                logger.error("Error details: %s. Did you set the speech "
+                             "resource key and endpoint values?",
+                             cancellation_details.error_details)
 
         return resp
 
@@ -217,11 +342,11 @@ class SpeechService:
 
         def recognized_handler(evt):
             if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                print(f"📝 Recognized: {evt.result.text}")
+                log_payload(logger, "Recognized", evt.result.text)
                 transcripts.append(evt.result.text)
 
         def stop_handler(evt):
-            print("⏹ Session ended.")
+            logger.info("Recognition session ended.")
 
         recognizer.recognized.connect(recognized_handler)
         recognizer.session_stopped.connect(stop_handler)
@@ -250,3 +375,46 @@ class SpeechService:
             "status": "COMPLETED" if transcripts else "NO_SPEECH",
             "text": full_text,
         }
+
+    def start_stream_recognition(self, on_partial=None, on_final=None,
+                                 sample_rate=16000):
+        """
+        Start continuous recognition on a push stream and return the
+        StreamingRecognition to feed. `on_partial(text)` fires for every
+        hypothesis, `on_final(text, language)` for every recognized phrase;
+        both are called on SDK threads.
+        """
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=sample_rate, bits_per_sample=16, channels=1)
+        push_stream = speechsdk.audio.PushAudioInputStream(
+            stream_format=stream_format)
+        recognizer = speechsdk.SpeechRecognizer(
+            speech_config=self.speech_config,
+            audio_config=speechsdk.audio.AudioConfig(stream=push_stream),
+            auto_detect_source_language_config=speechsdk.AutoDetectSourceLanguageConfig(
+                languages=self.languages)
+        )
+        session = StreamingRecognition(recognizer, push_stream)
+
+        def recognizing_handler(evt):
+            if on_partial and evt.result.text:
+                on_partial(evt.result.text)
+
+        def recognized_handler(evt):
+            if evt.result.reason != speechsdk.ResultReason.RecognizedSpeech:
+                return
+            session.language = evt.result.properties.get(
+                speechsdk.PropertyId.SpeechServiceConnection_AutoDetectSourceLanguageResult)
+            session.transcripts.append(evt.result.text)
+            if on_final:
+                on_final(evt.result.text, session.language)
+
+        def stop_handler(evt):
+            session.stopped.set()
+
+        recognizer.recognizing.connect(recognizing_handler)
+        recognizer.recognized.connect(recognized_handler)
+        recognizer.session_stopped.connect(stop_handler)
+        recognizer.canceled.connect(stop_handler)
+        recognizer.start_continuous_recognition()
+        return session
@@ -0,0 +1,202 @@
+"""
+WebSocket endpoint for live speech recognition.
+
+Clients connect to /ws/recognize?rate=16000, send 16-bit mono PCM frames as
+binary messages while the user is speaking, and send the text message "EOS"
+when they stop. The server answers on the same socket with JSON messages:
+
+    {"type": "partial", "text": "..."}                  # running hypothesis
+    {"type": "final", "text": "...", "language": "..."} # recognized phrase
+    {"type": "result", "status": "...", "text": "...", "language": "..."}
+
+The "result" message carries the full transcript and closes the socket.
+
+/ws/synthesize streams TTS the other way: the client sends one JSON message
+{"text": ..., "tone": ..., "lang": ..., "ssml_config": {...}} and receives
+raw 24 kHz 16-bit mono PCM chunks as binary messages while Azure is still
+synthesizing, interleaved with caption events:
+
+    {"type": "word", "text": "...", "audio_offset_ms": ..., ...}
+    {"type": "done", "first_chunk_ms": ..., "total_ms": ..., "bytes": ...}
+
+Both endpoints are paid Azure sessions, so the server binds to localhost
+by default and only accepts browser connections from STREAM_ALLOWED_ORIGINS
+(by default the local Streamlit app on port 8501, 8051 or
+STREAMLIT_SERVER_PORT). When STREAM_SERVER_TOKEN is set every client must
+also pass it as ?token=...; a token is required to listen on a non-loopback
+--host.
+
+    python -m services.stream_server --port 8765
+"""
+import argparse
+import hmac
+import json
+import os
+import sys
+import time
+
+import tornado.ioloop
+import tornado.web
+import tornado.websocket
+
+from services.speech_service import SpeechService
+
+# Azure speech recognition accepts 8 kHz and 16 kHz PCM input.
+SUPPORTED_RATES = (8000, 16000)
+# Streamlit's default port and the one the Dockerfile serves the app on.
+STREAMLIT_PORTS = ("8501", "8051")
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def default_allowed_origins():
+    """Local origins of the Streamlit app, including STREAMLIT_SERVER_PORT
+    when it is set."""
+    ports = list(STREAMLIT_PORTS)
+    if os.environ.get("STREAMLIT_SERVER_PORT"):
+        ports.append(os.environ["STREAMLIT_SERVER_PORT"])
+    return ",".join(f"http://{host}:{port}" for port in ports
+                    for host in ("localhost", "127.0.0.1"))
+
+
+class GuardedSocket(tornado.websocket.WebSocketHandler):
+    """Rejects foreign browser origins and, if configured, missing tokens
+    before the WebSocket upgrade."""
+
+    def initialize(self, speech, allowed_origins=(), token=None):
+        self.speech = speech
+        self.allowed_origins = allowed_origins
+        self.token = token
+
+    def check_origin(self, origin):
+        # Only called for browser clients, which always send an Origin.
+        return origin in self.allowed_origins
+
+    def prepare(self):
+        if self.token and not hmac.compare_digest(
+                self.get_argument("token", "").encode(),
+                self.token.encode()):
+            raise tornado.web.HTTPError(403, "invalid token")
+
+
+class RecognizeSocket(GuardedSocket):
+    def initialize(self, speech, **kwargs):
+        super().initialize(speech, **kwargs)
+        self.session = None
+
+    def prepare(self):
+        super().prepare()
+        rate = self.get_argument("rate", "16000")
+        if not rate.isdigit() or int(rate) not in SUPPORTED_RATES:
+            raise tornado.web.HTTPError(
+                400, f"rate must be one of {SUPPORTED_RATES}")
+        self.sample_rate = int(rate)
+
+    async def open(self):
+        self.loop = tornado.ioloop.IOLoop.current()
+        # Starting recognition connects to Azure, so keep it off the loop.
+        self.session = await self.loop.run_in_executor(
+            None, lambda: self.speech.start_stream_recognition(
+                on_partial=lambda text: self._emit(
+                    {"type": "partial", "text": text}),
+                on_final=lambda text, language: self._emit(
+                    {"type": "final", "text": text, "language": language}),
+                sample_rate=self.sample_rate
+            ))
+
+    def _emit(self, payload):
+        # SDK callbacks run on their own threads; hop back onto the loop.
+        self.loop.add_callback(self._write, payload)
+
+    def _write(self, payload):
+        if self.ws_connection is not None:
+            self.write_message(json.dumps(payload))
+
+    async def on_message(self, message):
+        if self.session is None:
+            return
+        if isinstance(message, bytes):
+            self.session.write(message)
+        elif message == "EOS":
+            result = await self.loop.run_in_executor(None, self.session.close)
+            self._write(dict(result, type="result"))
+            self.close()
+
+    def on_close(self):
+        if self.session is not None and not self.session.closed:
+            self.loop.run_in_executor(None, self.session.close)
+
+
+class SynthesizeSocket(GuardedSocket):
+    def open(self):
+        self.loop = tornado.ioloop.IOLoop.current()
+
+    def _send(self, message, binary=False):
+        if self.ws_connection is not None:
+            self.write_message(message, binary=binary)
+
+    def _stream(self, request):
+        # Runs on an executor thread; every send hops back onto the loop.
+        start = time.time()
+        first_chunk_ms = None
+        size = 0
+        for chunk in self.speech.stream_text_to_speech(
+                text=request["text"],
+                ssml_config=request.get("ssml_config", {}),
+                tone=request.get("tone", "friendly"),
+                lang=request.get("lang", "en-US"),
+                on_word_boundary=lambda event: self.loop.add_callback(
+                    self._send, json.dumps(dict(event, type="word")))):
+            if first_chunk_ms is None:
+                first_chunk_ms = round((time.time() - start) * 1000)
+            size += len(chunk)
+            self.loop.add_callback(self._send, chunk, True)
+        return {"type": "done", "first_chunk_ms": first_chunk_ms,
+                "total_ms": round((time.time() - start) * 1000),
+                "bytes": size}
+
+    async def on_message(self, message):
+        try:
+            summary = await self.loop.run_in_executor(
+                None, self._stream, json.loads(message))
+        except Exception as e:
+            summary = {"type": "error", "error": str(e)}
+        self._send(json.dumps(summary))
+        self.close()
+
+
+def make_app(speech=None, allowed_origins=None, token=None):
+    speech = speech or SpeechService(play_audio=False,
+                                     method="CONTINUOUS_RECOGNITION")
+    if allowed_origins is None:
+        allowed_origins = os.environ.get("STREAM_ALLOWED_ORIGINS",
+                                         default_allowed_origins())
+        allowed_origins = [o.strip() for o in allowed_origins.split(",")
+                           if o.strip()]
+    if token is None:
+        token = os.environ.get("STREAM_SERVER_TOKEN") or None
+    kwargs = {"speech": speech, "allowed_origins": tuple(allowed_origins),
+              "token": token}
+    return tornado.web.Application([
+        (r"/ws/recognize", RecognizeSocket, kwargs),
+        (r"/ws/synthesize", SynthesizeSocket, kwargs),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live speech server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    if args.host not in LOOPBACK_HOSTS and \
+            not os.environ.get("STREAM_SERVER_TOKEN"):
+        sys.exit("❌ Set STREAM_SERVER_TOKEN before listening on "
+                 f"{args.host}; the endpoints spend Azure credits.")
+    make_app().listen(args.port, address=args.host)
+    base = f"ws://{args.host}:{args.port}"
+    print(f"🎧 Streaming recognition on {base}/ws/recognize")
+    print(f"🔊 Streaming synthesis on {base}/ws/synthesize")
+    tornado.ioloop.IOLoop.current().start()
+
+
+if __name__ == "__main__":
+    main()
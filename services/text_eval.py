@@ -25,3 +25,12 @@ def evaluate_text(original_text, generated_text):
     # Compute all metrics safely
     measures = jiwer.compute_measures(ref, hyp)
     return round(measures["wer"]*100, 2)
+
+
+def word_error_rate(reference, hypothesis):
+    """WER, or (None, reason) when it cannot be computed (e.g. an empty
+    hypothesis from a NoSpeech result)."""
+    try:
+        return evaluate_text(reference, hypothesis or ""), None
+    except ValueError as e:
+        return None, str(e)
@@ -0,0 +1,246 @@
+import contextvars
+import os
+import re
+import statistics
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import constants
+from services.logger import get_logger
+
+logger = get_logger("tts_router")
+
+PROVIDERS = ("Azure", "OpenAI")
+
+SSML_TAG = re.compile(r"</?[A-Za-z][\w:-]*(\s[^<>]*)?/?>")
+
+
+def strip_ssml(text):
+    """Drop SSML tags (<break/>, <emphasis> ...); OpenAI reads them aloud."""
+    return re.sub(r"\s{2,}", " ", SSML_TAG.sub("", text)).strip()
+
+
+class ProviderHealth:
+    """Rolling latency / error window and circuit breaker for one provider."""
+
+    def __init__(self, window=50, failure_threshold=3, cooldown=30.0,
+                 min_samples=5):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.time()
+
+    def is_available(self):
+        # After the cooldown the breaker is half-open: the next call is let
+        # through and either closes it or re-opens it for another cooldown.
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            return time.time() - self.opened_at >= self.cooldown
+
+    def p95(self):
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            return statistics.quantiles(self.latencies, n=20)[-1]
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            errors = self.outcomes.count(False)
+            return {
+                "samples": len(self.outcomes),
+                "error_rate": round(errors / len(self.outcomes), 3)
+                if self.outcomes else 0.0,
+                "p50": latencies[len(latencies) // 2] if latencies else None,
+                "circuit_open": self.opened_at is not None,
+            }
+
+
+class TTSRouter:
+    """
+    Routes TTS between SpeechService.text_to_speech ("Azure") and
+    OpenAIService.speak ("OpenAI").
+
+    The preferred provider is called first. If it has not answered within
+    its recent p95 latency a hedged request goes to the other provider and
+    whichever succeeds first wins. Providers that keep failing are skipped
+    until their circuit breaker cools down.
+    """
+
+    def __init__(self, speech, openai, hedge_floor=None, **health_kwargs):
+        self.speech = speech
+        self.openai = openai
+        # Never hedge earlier than this, even if the p95 is very low.
+        self.hedge_floor = hedge_floor if hedge_floor is not None else float(
+            os.environ.get("TTS_HEDGE_FLOOR_SECONDS", "1.0"))
+        self.health = {name: ProviderHealth(**health_kwargs)
+                       for name in PROVIDERS}
+        self.stats = {"requests": 0, "hedged": 0, "secondary_wins": 0,
+                      "failovers": 0}
+        self._pool = ThreadPoolExecutor(max_workers=8,
+                                        thread_name_prefix="tts")
+
+    def _call(self, provider, request):
+        output_path = request["path_factory"](
+            constants.TTS_OUTPUT_FORMATS[request["output_format"]]["suffix"])
+        try:
+            result = self._dispatch(provider, request, output_path)
+        except Exception:
+            request["release"](output_path)
+            raise
+        if result[0] is None:
+            request["release"](output_path)
+        return result
+
+    def _dispatch(self, provider, request, output_path):
+        if provider == "OpenAI":
+            instructions = request["ssml_config"]
+            if isinstance(instructions, dict):
+                # Azure-shaped config: its style is the closest instruction.
+                instructions = instructions.get("style", "")
+            return self.openai.speak(
+                # Azure-prompt replies carry inline SSML tags.
+                text=strip_ssml(request["text"]),
+                voice=request["voice"],
+                instructions=instructions,
+                output_format=request["output_format"],
+                output_path=output_path
+            )
+        ssml_config = request["ssml_config"]
+        if not isinstance(ssml_config, dict):
+            # OpenAI-shaped instructions: fall back to the tone defaults.
+            ssml_config = {}
+        return self.speech.text_to_speech(
+            text=request["text"],
+            ssml_config=ssml_config,
+            tone=request["tone"],
+            lang=request["lang"],
+            output_format=request["output_format"],
+            output_path=output_path
+        )
+
+    def _timed_call(self, provider, request):
+        start = time.time()
+        try:
+            output_path, time_taken = self._call(provider, request)
+        except Exception as e:
+            logger.warning("%s TTS failed: %s", provider, e)
+            self.health[provider].record_failure()
+            raise
+        if output_path is None:
+            self.health[provider].record_failure()
+            raise RuntimeError(f"{provider} TTS returned no audio")
+        self.health[provider].record_success(time.time() - start)
+        return provider, output_path, time_taken
+
+    def _submit(self, provider, request):
+        # Carry the caller's context (log correlation id) into the worker.
+        return self._pool.submit(contextvars.copy_context().run,
+                                 self._timed_call, provider, request)
+
+    def _order(self, preferred):
+        secondary = [p for p in PROVIDERS if p != preferred]
+        available = [p for p in [preferred] + secondary
+                     if self.health[p].is_available()]
+        # With every breaker open, still try rather than fail outright.
+        return available or [preferred] + secondary
+
+    def synthesize(self, text, preferred="OpenAI", voice="nova",
+                   ssml_config=None, tone="friendly", lang="en-US",
+                   output_format="wav", hedge=True, path_factory=None,
+                   release=None):
+        """
+        Returns (provider, output_path, time_taken); output_path is None if
+        every provider failed. `path_factory(suffix)` allocates the output
+        file for each attempt (a temp file by default) and `release(path)`
+        deletes the files of failed and losing attempts. Both run on worker
+        threads.
+        """
+        self.stats["requests"] += 1
+        request = {"text": text, "voice": voice, "tone": tone, "lang": lang,
+                   "ssml_config": ssml_config or {},
+                   "output_format": output_format,
+                   "path_factory": path_factory or self._temp_path,
+                   "release": release or self._remove_path}
+        order = self._order(preferred)
+        if order[0] != preferred:
+            self.stats["failovers"] += 1
+
+        start = time.time()
+        pending = {self._submit(order[0], request)}
+        backups = order[1:]
+
+        if hedge and backups:
+            p95 = self.health[order[0]].p95()
+            hedge_after = max(p95, self.hedge_floor) if p95 else None
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done:
+                logger.info("%s TTS slower than p95 (%.2fs), hedging to %s",
+                            order[0], hedge_after, backups[0])
+                self.stats["hedged"] += 1
+                pending.add(self._submit(backups[0], request))
+                backups = backups[1:]
+
+        while pending or backups:
+            if not pending:
+                self.stats["failovers"] += 1
+                pending.add(self._submit(backups[0], request))
+                backups = backups[1:]
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                provider, output_path, _ = future.result()
+                if provider != order[0]:
+                    self.stats["secondary_wins"] += 1
+                for loser in pending:
+                    loser.add_done_callback(
+                        lambda f: self._discard_output(f, request["release"]))
+                return provider, output_path, round(time.time() - start, 2)
+
+        return None, None, round(time.time() - start, 2)
+
+    @staticmethod
+    def _temp_path(suffix):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        return path
+
+    @staticmethod
+    def _remove_path(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _discard_output(future, release):
+        if future.exception() is None:
+            _, output_path, _ = future.result()
+            release(output_path)
+
+    def snapshot(self):
+        return {name: health.snapshot()
+                for name, health in self.health.items()}
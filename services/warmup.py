@@ -0,0 +1,56 @@
+import importlib
+import threading
+import time
+
+from services.logger import get_logger
+
+logger = get_logger("warmup")
+
+HEAVY_MODULES = (
+    "azure.cognitiveservices.speech",
+    "openai",
+    "pydantic",
+    "pydub",
+    "audiorecorder",
+)
+
+
+def warm_up(service_getters, modules=HEAVY_MODULES):
+    """
+    Import the heavy SDKs and make a first connection to each backend.
+
+    `service_getters` are zero-argument callables returning services with a
+    `warm_up()` method. Returns the seconds spent per step; failures are
+    reported and skipped so a missing credential never blocks startup.
+    """
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning("Warm-up import of %s failed: %s", name, e)
+            continue
+        timings[f"import:{name}"] = round(time.perf_counter() - start, 3)
+
+    for getter in service_getters:
+        start = time.perf_counter()
+        try:
+            service = getter()
+            service.warm_up()
+        except Exception as e:
+            logger.warning("Warm-up of %s failed: %s",
+                           getattr(getter, "__name__", getter), e)
+            continue
+        timings[f"connect:{type(service).__name__}"] = round(
+            time.perf_counter() - start, 3)
+
+    logger.info("Warm-up done: %s", timings)
+    return timings
+
+
+def start_background_warm_up(service_getters, modules=HEAVY_MODULES):
+    thread = threading.Thread(target=warm_up, args=(service_getters, modules),
+                              name="warm-up", daemon=True)
+    thread.start()
+    return thread